@@ -0,0 +1,222 @@
+### Benchmarks of the foil libraries (ForPython3)
+#
+#   Times and peak memory (tracemalloc) of the main paths of the libraries :
+#        - NACA()/Series4 construction and surface evaluation
+#        - WAGENINGEN() construction (Z, EAR, rR, Use_Smooth) with all its splines
+#        - write4Xfoil
+#        - NPFoil.Doc.add (headless Doc.add) for 10/100/1000 sections
+#        - PANEL_LIB.PanelSolver for all the radii of a blade and many angles of attack
+#
+#   The results are appended to bench_results.jsonl (one line per benchmark
+#   and parameters) with the git commit of the library, so that the commits
+#   can be compared.
+#
+#   Usage :
+#        python bench_foils.py                      : run all the benchmarks
+#        python bench_foils.py -k WAGENINGEN        : run the benchmarks whose name contains WAGENINGEN
+#        python bench_foils.py --quick              : one repeat, smallest parameters only
+#        python bench_foils.py --list               : list the benchmarks
+#        python bench_foils.py --compare c1 c2      : compare the results of the commits c1 and c2
+#
+#   A benchmark is a function decorated by @benchmark(params) : it receives the
+#   parameters, does the setup (not timed) and returns the function to time.
+#
+###
+import os
+import sys
+import json
+import time
+import timeit
+import tracemalloc
+import warnings
+import itertools
+import subprocess
+
+here=os.path.dirname(os.path.abspath(__file__))
+lib=os.path.join(here,"..","ForPython3")
+sys.path.insert(0,lib)
+
+results_file=os.path.join(here,"bench_results.jsonl")
+
+### Registry of the benchmarks
+benchmarks={}
+
+def benchmark(**params):
+    """ Registers a benchmark : params are the lists of values of its parameters (all the combinations are run) """
+    def register(f):
+        benchmarks[f.__name__]=(f,params)
+        return f
+    return register
+
+
+### NACA
+@benchmark(code=["4412","23012"])
+def NACA_construction(code):
+    from NACA_LIB import NACA
+    return lambda: NACA(code)
+
+@benchmark(npoints=[20,200,2000,20000])
+def Series4_surfaces(npoints):
+    from numpy import linspace
+    from NACA_LIB import Series4
+    foil=Series4(0.04,0.4,0.12)
+    x=linspace(0,1,npoints)
+    return lambda: foil.surfaces(x)
+
+
+### WAGENINGEN
+@benchmark(Z=[3,4,6],EAR=[0.4,1.0],rR=[0.2,0.7],Use_Smooth=[0,1])
+def WAGENINGEN_construction(Z,EAR,rR,Use_Smooth):
+    from WAGENINGEN_LIB import WAGENINGEN, clear_splines_cache
+    def run():
+        # Construction without the splines cache (the splines are constructed when first used : all of them are constructed)
+        clear_splines_cache()
+        WAGENINGEN(Z,EAR,rR,Use_Smooth=Use_Smooth).construct_section_splines()
+    return run
+
+@benchmark(Use_Smooth=[0,1])
+def WAGENINGEN_construction_cached(Use_Smooth):
+    from WAGENINGEN_LIB import WAGENINGEN
+    WAGENINGEN(4,0.7,0.5,Use_Smooth=Use_Smooth).construct_section_splines()
+    return lambda: WAGENINGEN(4,0.7,0.5,Use_Smooth=Use_Smooth).construct_section_splines()
+
+@benchmark(npoints=[20,200,2000])
+def WAGENINGEN_surfaces(npoints):
+    from numpy import linspace
+    from WAGENINGEN_LIB import WAGENINGEN
+    foil=WAGENINGEN(4,0.7,0.5)
+    x=linspace(0,1,npoints)
+    return lambda: foil.surfaces(x)
+
+
+### Panel method
+@benchmark(n_sections=[1,20],n_alpha=[1,36])
+def Panel_blade(n_sections,n_alpha):
+    from numpy import linspace, cos, pi
+    from WAGENINGEN_LIB import WAGENINGEN_sections
+    from PANEL_LIB import PanelSolver, contours
+    rR=linspace(0.2,0.95,n_sections)
+    x=1-cos(pi*linspace(0,1,100)/2)
+    alpha=linspace(-6,12,n_alpha)
+    ys,yp,yc,yt=WAGENINGEN_sections(4,0.7,rR,x)
+    P=contours(x,ys,yp)
+    return lambda: PanelSolver(points=P).solve(alpha)
+
+
+### write4Xfoil
+@benchmark(foil=["NACA","WAGENINGEN"],npoints=[60,600])
+def write4Xfoil(foil,npoints):
+    # The files are written to the temporary working directory of run()
+    from NACA_LIB import NACA
+    from WAGENINGEN_LIB import WAGENINGEN
+    afoil=NACA("4412") if (foil=="NACA") else WAGENINGEN(4,0.7,0.5)
+    return lambda: afoil.write4Xfoil(npoints=npoints,spacing='cos')
+
+
+### Headless Doc.add
+@benchmark(section=["NACA","WAGENINGEN"],n_sections=[10,100,1000])
+def Doc_add(section,n_sections):
+    import NPFoil
+    doc=NPFoil.Doc(n_sections=n_sections)
+    if (section=="NACA"):
+        doc.NACA("4412")
+    else:
+        doc.WAGEN(4,0.7)
+    def run():
+        doc.sections=[]
+        doc.add()
+    return run
+
+
+### Runner
+def commit():
+    """ Commit of the library (with '+' if the library has uncommitted changes) """
+    try:
+        c=subprocess.run(["git","rev-parse","--short","HEAD"],cwd=lib,capture_output=True,text=True).stdout.strip()
+        d=subprocess.run(["git","status","--porcelain","."],cwd=lib,capture_output=True,text=True).stdout.strip()
+        return c+("+" if d else "")
+    except OSError:
+        return "unknown"
+
+def cases(name,quick=False):
+    """ Parameters of the runs of the benchmark name """
+    f,params=benchmarks[name]
+    keys=list(params)
+    values=[params[k][:1] if quick else params[k] for k in keys]
+    return [dict(zip(keys,v)) for v in itertools.product(*values)]
+
+def run(name,p,repeat=5):
+    """ Time (best of repeat, seconds per call) and peak memory (bytes, one call) of the benchmark name with the parameters p 
+        The benchmark runs in a temporary working directory (removed afterwards) """
+    import tempfile
+    f=benchmarks[name][0]
+    cwd=os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                g=f(**p)
+                g()
+                timer=timeit.Timer(g)
+                number,t=timer.autorange()
+                times=[t/number]+[x/number for x in timer.repeat(repeat-1,number)]
+                tracemalloc.start()
+                g()
+                peak=tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        finally:
+            os.chdir(cwd)
+    return min(times), peak
+
+def load(c):
+    """ Results of the commit c : {(name,params) : record} (the last run of each benchmark) """
+    R={}
+    if (os.path.exists(results_file)):
+        with open(results_file) as f:
+            for line in f:
+                r=json.loads(line)
+                if (r["commit"]==c):
+                    R[(r["name"],json.dumps(r["params"],sort_keys=True))]=r
+    return R
+
+def compare(c1,c2):
+    """ Prints the ratios of the times and of the peak memories of the commits c2 over c1 """
+    R1,R2=load(c1),load(c2)
+    print("{:50s} {:>11s} {:>11s} {:>7s} {:>9s}".format("benchmark","time "+c1[:4],"time "+c2[:4],"ratio","mem ratio"))
+    for k in sorted(set(R1)&set(R2)):
+        r1,r2=R1[k],R2[k]
+        print("{:50s} {:11.3e} {:11.3e} {:7.2f} {:9.2f}".format(k[0]+k[1],r1["time"],r2["time"],r2["time"]/r1["time"],r2["peak"]/max(r1["peak"],1)))
+
+def main(argv):
+    import argparse
+    import numpy, scipy
+    parser=argparse.ArgumentParser(description="Benchmarks of the foil libraries")
+    parser.add_argument("-k",default="",help="run the benchmarks whose name contains K")
+    parser.add_argument("--quick",action="store_true",help="one repeat, first parameters only")
+    parser.add_argument("--repeat",type=int,default=5)
+    parser.add_argument("--list",action="store_true",help="list the benchmarks")
+    parser.add_argument("--compare",nargs=2,metavar=("C1","C2"),help="compare the results of two commits")
+    parser.add_argument("--no-save",action="store_true",help="do not append the results to bench_results.jsonl")
+    a=parser.parse_args(argv)
+    if (a.compare):
+        compare(*a.compare)
+        return
+    names=[n for n in benchmarks if a.k in n]
+    if (a.list):
+        for n in names:
+            print(n,benchmarks[n][1])
+        return
+    c=commit()
+    env=dict(python=sys.version.split()[0],numpy=numpy.__version__,scipy=scipy.__version__)
+    print("commit",c,env)
+    for n in names:
+        for p in cases(n,a.quick):
+            t,peak=run(n,p,1 if a.quick else a.repeat)
+            print("{:30s} {:50s} {:11.3e} s {:11.3f} MB".format(n,json.dumps(p),t,peak/1e6))
+            if (not a.no_save):
+                with open(results_file,"a") as f:
+                    f.write(json.dumps(dict(commit=c,date=time.strftime("%Y-%m-%d %H:%M:%S"),name=n,params=p,time=t,peak=peak,**env))+"\n")
+
+if __name__=="__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,31 @@
+# Check of the blades wrapped on the pitch helices (BLADE_LIB) : the face (pressure side) faces downstream
+#
+#   Usage :
+#        python test_blade.py
+#
+import os
+import sys
+import warnings
+from numpy import linspace, cos, pi, hypot
+
+here=os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0,os.path.join(here,"..","ForPython3"))
+
+from WAGENINGEN_LIB import WAGENINGEN_blade
+
+x=1-cos(pi*linspace(0,1,41)/2)
+rR=linspace(0.2,0.95,16)
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    for Z,EAR in ((3,0.5),(4,0.55),(5,0.75)):
+        for P_D in (0.6,1.0,1.4):
+            for skew in (0,20):
+                back,face=WAGENINGEN_blade(Z,EAR,P_D,rR,x,skew=skew)
+                # y : propeller axis, positive downstream (towards the trailing edges)
+                assert (face[:,-1,1]>face[:,0,1]).all(), "the trailing edges are not downstream of the leading edges"
+                # From the face to the back (points of the same x, inside the section) : upstream
+                d=back[:,1:-1]-face[:,1:-1]
+                assert (d[...,1]<0).all(), "Z={:d} EAR={:.2f} P/D={:.1f} : the face does not face downstream".format(Z,EAR,P_D)
+                # The points stay on the cylinders
+                assert (abs(hypot(back[...,0],back[...,2])-rR[:,None])<1e-12).all()
+print("OK")
@@ -0,0 +1,42 @@
+# Check of the disk cache (CACHE_LIB) : foils defined by arrays with the same name must not share entries
+#
+#   Usage :
+#        python test_cache.py
+#
+import os
+import sys
+import tempfile
+from numpy import array, linspace, allclose
+
+here=os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0,os.path.join(here,"..","ForPython3"))
+
+import FOIL
+from NACA_LIB import NACA, Series4Family
+from CAMBER_LIB import DecomposedFoil
+
+def check(foils):
+    """ The sides of the foils taken from the cache are the sides computed without the cache """
+    for afoil in foils:
+        for i in range(2):
+            for cached, direct in zip(afoil.SuctionSide_FCAD(40,spacing='cos'),afoil.SuctionSide_FCAD(40,spacing='cos',cached=False)):
+                assert allclose(cached,direct), afoil.name()+" : wrong side from the cache"
+
+with tempfile.TemporaryDirectory() as d:
+    cache=FOIL.enable_disk_cache(d)
+    try:
+        # Same code (NACA4_family_n2) for different parameters
+        A=Series4Family(array([0.02,0.04])[:,None],0.4,0.12)
+        B=Series4Family(array([0.06,0.00])[:,None],0.4,0.12)
+        assert A.name()==B.name()
+        check([A,B])
+        # Same name for different camber lines
+        x=linspace(0,1,41)
+        yt=NACA("0012").yt(x)
+        C=DecomposedFoil(x,0.02*x*(1-x),yt,name="section")
+        D=DecomposedFoil(x,0.08*x*(1-x),yt,name="section")
+        check([C,D])
+        print("Disk cache : hits=",cache.hits,", misses=",cache.misses)
+    finally:
+        FOIL.disable_disk_cache()
+print("OK")
@@ -0,0 +1,52 @@
+# Check of the decomposition of sections given by points (CAMBER_LIB) : thick cambered sections
+#
+#   Usage :
+#        python test_camber.py
+#
+import os
+import sys
+import warnings
+from numpy import stack, isfinite, abs as npabs
+
+here=os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0,os.path.join(here,"..","ForPython3"))
+
+from NACA_LIB import NACA
+from WAGENINGEN_LIB import WAGENINGEN
+from CAMBER_LIB import decompose, DecomposedFoil
+
+# NACA sections : camber line and thickness of the foil (the points are normalized)
+for code in ("2415","4415","2418","4418","6421","23024"):
+    afoil=NACA(code)
+    for npoints in (60,100,200):
+        for normalized in (False,True):
+            x,yc,yt,LE,chord,angle=decompose(afoil.points4Xfoil(npoints,'cos'),normalized=normalized)
+            assert isfinite(yc).all() and isfinite(yt).all(), code
+            assert npabs(yc).max()<0.1 and npabs(yt).max()<0.15, code+" : wrong camber line or thickness"
+            if (normalized and npoints>=100):
+                assert npabs(yc-afoil.yc(x)).max()<1e-4, code+" : wrong camber line"
+                assert npabs(yt-afoil.yt(x)).max()<1e-3, code+" : wrong thickness"
+
+# Wageningen B4-55 sections at all the radii (root sections included), all the sections together
+rR=(0.2,0.25,0.3,0.4,0.5,0.6,0.7,0.8,0.9)
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    sections=[WAGENINGEN(4,0.55,r) for r in rR]
+    P=stack([s.points4Xfoil(100,'cos') for s in sections])
+x,yc,yt,LE,chord,angle=decompose(P)
+assert isfinite(yc).all() and isfinite(yt).all()
+for i,s in enumerate(sections):
+    # The thickness of the decomposed section is the thickness of the section
+    t=(s.Ys(x)-s.Yp(x)).max()/chord[i]
+    assert abs(2*yt[i].max()-t)<1e-3*max(t,0.1), "rR={:.2f} : wrong thickness".format(rR[i])
+    assert npabs(yc[i]).max()<0.1, "rR={:.2f} : wrong camber line".format(rR[i])
+    DecomposedFoil(x,yc[i],yt[i])
+
+# Points that are not a foil
+try:
+    decompose([[1,0],[0,1],[0.5,-1],[0.2,0.3],[1,0.1]])
+except ValueError:
+    pass
+else:
+    raise AssertionError("no error for points that are not a foil")
+print("OK")
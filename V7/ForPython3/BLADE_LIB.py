@@ -0,0 +1,63 @@
+### PART OF FOIL LIBRARY
+#
+# Author: Konstantinos POLITIS
+#
+#   Propeller blades : the sections at the radii r/R are wrapped on their
+#   pitch helices (cylinders of radius r) as in props_geo/WagSectionCyliWrap_multi.m,
+#   for all the radii and all the points of the sections at once.
+#
+#   Coordinates (as in WagSectionCyliWrap_multi.m) :
+#        y       : propeller axis (positive towards the trailing edges, downstream)
+#        z       : generator line (reference line of the blade for zero skew)
+#        x       : completes the right handed system
+#
+#   On the cylinder of radius r a section is placed in the developed plane
+#   (circumferential length r theta, axial length) along its pitch line, of
+#   pitch angle phi=atan(P/(2 pi r)), with its reference point (the generator
+#   line location along the chord) at the angle skew and the axial distance rake.
+#   The face (pressure side) faces downstream and the back (suction side) upstream :
+#   the sections go from the leading edge to the trailing edge along the pitch line
+#   (towards +y) and the back is on its upstream side (the chordwise coordinate of
+#   WagSectionCyliWrap_multi.m goes from the trailing edge to the leading edge).
+#
+#   This module does not depend on FreeCAD.
+#
+###
+
+def pitch_angle(rR,P_D):
+    """ Pitch angle (radians) phi=atan(P/(2 pi r))=atan((P/D)/(pi r/R)) """
+    from numpy import arctan, pi
+    return arctan(P_D/(pi*rR))
+
+def wrap_sections(rR,x,y,cR,P_D,xg=0.5,skew=0,rake=0,R=1):
+    """ Wraps the sections at the radii rR on their pitch helices
+    Inputs :
+      rR      : array of n_r non dimensional radii (r/R)
+      x, y    : (n_r,n_p) arrays (or (n_p,) arrays, same for all the radii) of the points of the sections as
+                fractions of the chord : x from the leading edge (0) to the trailing edge (1), y positive towards the back
+      cR      : chord over radius c/R at rR
+      P_D     : pitch over diameter at rR
+      xg      : location of the reference point (generator line) along the chord from the leading edge (fraction of chord)
+      skew    : skew angle (degrees) of the reference point, positive towards the trailing edge (skew back)
+      rake    : rake over radius of the reference point, positive towards the trailing edge (along y)
+      R       : radius of the propeller
+      The radial quantities (cR, P_D, xg, skew, rake) are scalars or arrays of n_r values.
+    Returns :
+      (n_r,n_p,3) array of the points (x,y,z) """
+    from numpy import asarray, cos, sin, pi, stack, broadcast_arrays
+    def col(v):
+        v=asarray(v,dtype=float)
+        return v.reshape(v.shape+(1,)) if (v.ndim>0) else v
+    rR=col(rR)
+    cR,P_D,xg,skew,rake=[col(v) for v in (cR,P_D,xg,skew,rake)]
+    x,y=broadcast_arrays(asarray(x,dtype=float),asarray(y,dtype=float))
+    phi=pitch_angle(rR,P_D)
+    # Section in the developed plane (over R) : s along the pitch line from the reference point, n normal to it (the direction 
+    # (-sin phi,cos phi) is downstream : the back is at n<0)
+    s=(x-xg)*cR
+    n=-y*cR
+    circ=s*cos(phi)-n*sin(phi)
+    axial=s*sin(phi)+n*cos(phi)+rake
+    # Wrap on the cylinder
+    theta=circ/rR+skew*pi/180
+    return R*stack((rR*sin(theta),axial,rR*cos(theta)),axis=-1)
@@ -0,0 +1,205 @@
+### PART OF FOIL LIBRARY
+#
+# Author: Konstantinos POLITIS
+#
+#   Persistent cache (on disk) of the sampled sides of the foils (see FOIL.enable_disk_cache)
+#
+#   Every entry is a .npz file (uncompressed numpy arrays) named by the sha256 of
+#   its key : the class of the foil, its parameters, the sampling (side, npoints,
+#   LE2TE, spacing) and the version of the library (hash of the source of the
+#   modules of the foil), so that a modification of the library invalidates the
+#   entries. The foils defined by arrays are identified by the hashes of the arrays or
+#   by their attribute digest (hash of the data defining the foil, e.g. FileFoil) : the
+#   foils with other attributes (splines ...) and without digest are not cached.
+#
+#   The size of the directory is limited : the least recently used entries are
+#   removed first (the modification time of an entry is updated when it is read).
+#
+#   Many processes may use the same directory : the entries are written to a
+#   temporary file which is then renamed (atomic), an entry removed by another
+#   process is a miss, and the eviction is done by one process at a time (lock file).
+#
+###
+import os
+
+# Default directory (if FOIL_CACHE_DIR is not set) and size
+__default_dir__=os.path.join(os.path.expanduser("~"),".cache","PEE_PythonFoils")
+__default_max_bytes__=256*2**20
+
+# Versions of the library for each class of foil (computed once per process)
+__versions__={}
+
+def library_version(cls):
+    """ Hash of the source files of the modules of the class cls and of its bases """
+    import sys
+    from hashlib import sha256
+    if (cls not in __versions__):
+        h=sha256()
+        for c in cls.__mro__:
+            m=sys.modules.get(c.__module__)
+            f=getattr(m,'__file__',None)
+            if (f is not None and f.endswith('.py')):
+                with open(f,'rb') as fh:
+                    h.update(fh.read())
+        __versions__[cls]=h.hexdigest()[:16]
+    return __versions__[cls]
+
+def parameters(obj):
+    """ Parameters of an object : its attributes that are numbers, strings or booleans (sorted by name) and the hashes of
+        its numpy arrays, except the attributes named in obj.cache_ignore
+        Returns None if obj has other attributes (e.g. splines) and no attribute digest (hash of the data defining obj) :
+        the parameters would not identify obj """
+    from numpy import generic, ndarray
+    from hashlib import sha256
+    ignore=getattr(obj,'cache_ignore',())
+    P=[]
+    for k,v in obj.__dict__.items():
+        if (k in ignore or v is None):
+            continue
+        if (isinstance(v,(int,float,str,bool,generic))):
+            P.append((k,v.item() if isinstance(v,generic) else v))
+        elif (isinstance(v,ndarray)):
+            P.append((k,(v.dtype.str,v.shape,sha256(v.tobytes()).hexdigest()[:16])))
+        elif (not hasattr(obj,'digest')):
+            return None
+    return tuple(sorted(P))
+
+def key_of(obj,*args):
+    """ Key of the entry of obj (class, parameters, version of the library) and args, None if obj cannot be cached (see parameters) """
+    P=parameters(obj)
+    if (P is None):
+        return None
+    return key_of_class(type(obj),P,*args)
+
+def key_of_class(cls,*args):
+    """ Key of the entry of args for the class cls (class, version of the library) """
+    from hashlib import sha256
+    desc=repr((cls.__module__,cls.__qualname__)+args+(library_version(cls),))
+    return sha256(desc.encode()).hexdigest()
+
+
+class DiskCache:
+    """ Cache of dicts of numpy arrays in a directory, limited to max_bytes (least recently used removed first) """
+
+    def __init__(self,directory=None,max_bytes=__default_max_bytes__):
+        self.directory=directory or os.environ.get("FOIL_CACHE_DIR") or __default_dir__
+        self.max_bytes=max_bytes
+        os.makedirs(self.directory,exist_ok=True)
+        self.hits=0
+        self.misses=0
+        # Bytes written since the last check of the size of the directory
+        self.__written=None
+
+    def path(self,key):
+        return os.path.join(self.directory,key+".npz")
+
+    def get(self,key):
+        """ Returns the dict of arrays of key (None if not in the cache) """
+        from numpy import load
+        p=self.path(key)
+        try:
+            with load(p) as A:
+                entry={k:A[k] for k in A.files}
+            # Most recently used
+            os.utime(p)
+        except FileNotFoundError:
+            self.misses+=1
+            return None
+        except Exception:
+            # Damaged entry
+            self.remove(key)
+            self.misses+=1
+            return None
+        self.hits+=1
+        return entry
+
+    def put(self,key,entry):
+        """ Stores the dict of arrays entry as key """
+        from numpy import savez
+        from tempfile import mkstemp
+        fd,tmp=mkstemp(prefix=".tmp-",suffix=".npz",dir=self.directory)
+        try:
+            with os.fdopen(fd,'wb') as f:
+                savez(f,**entry)
+            size=os.path.getsize(tmp)
+            os.replace(tmp,self.path(key))
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        # Check the size of the directory when 1/16 of max_bytes was written (and at the first write)
+        if (self.__written is None or self.__written+size>self.max_bytes/16):
+            self.__written=0
+            self.evict()
+        else:
+            self.__written+=size
+
+    def get_or_compute(self,key,compute):
+        """ Returns the entry of key, computed by compute() and stored if not in the cache """
+        entry=self.get(key)
+        if (entry is None):
+            entry=compute()
+            self.put(key,entry)
+        return entry
+
+    def remove(self,key):
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def entries(self):
+        """ List of (last use time, size, path) of the entries """
+        E=[]
+        for e in os.scandir(self.directory):
+            if (e.name.endswith(".npz") and not e.name.startswith(".")):
+                try:
+                    s=e.stat()
+                except OSError:
+                    continue
+                E.append((s.st_mtime,s.st_size,e.path))
+        return E
+
+    def size(self):
+        """ Total size (bytes) of the entries """
+        return sum(s for t,s,p in self.entries())
+
+    def evict(self,max_bytes=None):
+        """ Removes the least recently used entries until the size is below max_bytes (by default the size limit)
+            Only one process evicts at a time : returns False if another process is evicting """
+        import time
+        max_bytes=self.max_bytes if (max_bytes is None) else max_bytes
+        with open(os.path.join(self.directory,".lock"),'w') as lock:
+            try:
+                import fcntl
+                fcntl.flock(lock,fcntl.LOCK_EX|fcntl.LOCK_NB)
+            except ImportError:
+                pass
+            except OSError:
+                return False
+            E=sorted(self.entries())
+            total=sum(s for t,s,p in E)
+            for t,s,p in E:
+                if (total<=max_bytes):
+                    break
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+                total-=s
+            # Temporary files left by interrupted writes
+            now=time.time()
+            for e in os.scandir(self.directory):
+                if (e.name.startswith(".tmp-")):
+                    try:
+                        if (now-e.stat().st_mtime>3600):
+                            os.remove(e.path)
+                    except OSError:
+                        pass
+        return True
+
+    def clear(self):
+        """ Removes all the entries """
+        self.evict(0)
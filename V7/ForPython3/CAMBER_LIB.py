@@ -0,0 +1,234 @@
+### PART OF FOIL LIBRARY
+#
+# Author: Konstantinos POLITIS
+#
+#   Camber line and thickness of foils given by points (measured sections, files)
+#
+#   The points of a section are the closed polygon of the foil (either orientation, from
+#   the trailing edge around the leading edge back to the trailing edge, e.g. the output of
+#   afoil.points4Xfoil or of a Selig file). The decomposition is the inverse of the
+#   construction of NACArep.Xs/Ys : the sides are at the distance yt(x) of the camber point
+#   (x,yc(x)) along the normal of the camber line
+#        Xs=x-yt sin(theta) Ys=yc+yt cos(theta)   Xp=x+yt sin(theta) Yp=yc-yt cos(theta)
+#   All the camber points are solved together (damped Newton iterations) so that every camber
+#   point is the midpoint of the cuts of the two sides by its normal (the slope of the camber
+#   line is the central difference with the neighbouring points).
+#   Note : the camber line is not a fixed point of "move the camber points to the midpoints"
+#          (that iteration diverges near the leading edge, where yt dyt/dx/dx is large), and a
+#          march from the leading edge with backward differences is unstable for thick cambered
+#          sections : both amplify the errors by yt dyt/dx/dx.
+#
+#   The sections are normalized : the leading edge is the point farthest from the trailing
+#   edge (midpoint of the first and last points), the chord is the distance from the leading
+#   edge to the trailing edge and the chord is rotated to the x axis.
+#
+#   All the operations are vectorized over the sections : (n_sections, N, 2) arrays of points
+#   (same number of points N for all the sections).
+#
+#   Example :
+#        x,yc,yt,LE,chord,angle=decompose(P)       # P : (n_sections,N,2)
+#        afoil=DecomposedFoil.from_points(P[0])   # a NACArep : Xs, Ys, yc, dyc, yt, ...
+#
+###
+from NACA_LIB import NACArep
+
+def __cut__(X,Y,iLE,direction,xc,yc,nx,ny):
+    """ Signed distances t along the normals n from the camber points (xc,yc) to their cuts by one side of the polygons X, Y :
+        the points iLE, iLE+direction, ... (binary search of the segment, the side is assumed monotone along the normal lines) """
+    from numpy import take_along_axis, where, clip
+    n,N=X.shape
+    L=((N-1-iLE) if (direction>0) else iLE)[:,None]
+    def point(p):
+        k=iLE[:,None]+direction*p
+        return take_along_axis(X,k,axis=1), take_along_axis(Y,k,axis=1)
+    def f(Px,Py):
+        return (Px-xc)*ny-(Py-yc)*nx
+    lo=0*xc.astype(int)
+    hi=lo+L
+    for it in range(int(N).bit_length()):
+        mid=(lo+hi)//2
+        below=f(*point(mid))<0
+        lo=where(below,mid,lo)
+        hi=where(below,hi,mid)
+    hi=where(hi>lo,hi,lo+1).clip(max=L)
+    X0,Y0=point(lo)
+    X1,Y1=point(hi)
+    f0,f1=f(X0,Y0),f(X1,Y1)
+    df=f0-f1
+    s=clip(f0/(df+(df==0)),0,1)
+    return (X0+s*(X1-X0)-xc)*nx+(Y0+s*(Y1-Y0)-yc)*ny
+
+def normalize(P):
+    """ Normalized sections : returns the points (n,N,2) with the leading edge at the origin and the trailing edge at (1,0),
+        the leading edge LE (n,2), the chord (n,) and the angle of the chord (n,) in the original coordinates, and the index of the
+        leading edge point (n,) """
+    from numpy import asarray, argmax, arange, hypot, arctan2, stack
+    P=asarray(P,dtype=float)
+    n=P.shape[0]
+    TE=0.5*(P[:,0]+P[:,-1])
+    iLE=argmax(((P-TE[:,None])**2).sum(axis=-1),axis=1)
+    LE=P[arange(n),iLE]
+    dx,dy=(TE-LE).T
+    chord=hypot(dx,dy)
+    cs,sn=(dx/chord)[:,None],(dy/chord)[:,None]
+    Q=(P-LE[:,None])/chord[:,None,None]
+    return stack((Q[...,0]*cs+Q[...,1]*sn,Q[...,1]*cs-Q[...,0]*sn),axis=-1), LE, chord, arctan2(dy,dx), iLE
+
+def __slope__(x,Y):
+    """ Slopes of the camber lines Y (n,n_x) at the interior locations x[1:-1] (second order central differences) """
+    hm,hp=x[1:-1]-x[:-2],x[2:]-x[1:-1]
+    return -hp/(hm*(hm+hp))*Y[:,:-2]+(hp-hm)/(hm*hp)*Y[:,1:-1]+hm/(hp*(hm+hp))*Y[:,2:]
+
+def decompose(P,x=None,npoints=101,normalized=False,tol=1e-12,maxiter=50):
+    """ Camber line and thickness of sections given by points
+    Inputs :
+      P                  : (N,2) points of a section or (n_sections,N,2) points of many sections (closed polygons, see above)
+      x                  : chordwise locations x=X/c (increasing from 0 to 1), default npoints with the spacing 'cos' of afoil
+      normalized         : True if the points are already normalized (chord from (0,0) to (1,0), e.g. points4Xfoil of a NACA foil) :
+                           the leading edge is then the point nearest to the origin and the points are neither scaled nor rotated 
+      tol, maxiter       : tolerance (fraction of chord) of the offsets of the midpoints and maximum number of Newton iterations
+    Returns :
+      x                  : (n_x,) locations
+      yc, yt             : (n_sections,n_x) camber line and half thickness (as NACArep.yc and yt), (n_x,) for one section
+      LE, chord, angle   : the leading edge, chord and chord angle (radians) of the sections in the coordinates of P 
+    Raises ValueError if the camber line of a section does not converge (e.g. the points are not a foil) """
+    from numpy import asarray, linspace, cos, pi, sqrt, zeros, ones, full, where, argmin, hypot, isfinite, concatenate, \
+                      arange, abs as npabs
+    from scipy.linalg import solve_banded
+    P=asarray(P,dtype=float)
+    single=(P.ndim==2)
+    if (single):
+        P=P[None]
+    n=len(P)
+    if (normalized):
+        Q=P
+        iLE=argmin((P**2).sum(axis=-1),axis=1)
+        LE,chord,angle=zeros((n,2)),full(n,1.),zeros(n)
+    else:
+        Q,LE,chord,angle,iLE=normalize(P)
+    X,Y=Q[...,0],Q[...,1]
+    if (x is None):
+        x=1-cos(pi*linspace(0,1,npoints)/2)
+    x=asarray(x,dtype=float)
+    m=len(x)-2
+    xi=full((n,m),1.)*x[1:-1]
+    # Leading edge : the point of the polygon, trailing edge : midpoint of the first and last points
+    y0=Y[arange(n),iLE][:,None]
+    y1=0.5*(Y[:,0]+Y[:,-1])[:,None]
+    def cuts(yc,nx,ny):
+        """ Offsets along the normals (nx,ny) of the midpoints of the cuts of the sides from the points (x,yc) and half thickness """
+        ta=__cut__(X,Y,iLE,1,xi,yc,nx,ny)
+        tb=__cut__(X,Y,iLE,-1,xi,yc,nx,ny)
+        return 0.5*(ta+tb), 0.5*npabs(ta-tb)
+    def residual(yc):
+        """ Offsets of the midpoints along the normals of the camber line yc (n,m) at x[1:-1] """
+        s=__slope__(x,concatenate((y0,yc,y1),axis=1))
+        nR=sqrt(1+s**2)
+        return cuts(yc,-s/nR,1/nR)
+    # Initial camber line : the chord (the slopes of the midpoints of vertical cuts are too large at the leading edge of cambered sections)
+    yc=y0+(y1-y0)*x[1:-1]
+    # Newton iterations on all the camber points together : the slope at x[i] depends on yc at x[i-1], x[i+1], the Jacobian is
+    # tridiagonal (computed by differences, perturbing every third point at once)
+    eps=1e-7
+    col=arange(m)%3
+    d,t=residual(yc)
+    err=npabs(d).max(axis=1)
+    for it in range(maxiter):
+        if (not (err>tol).any()):
+            break
+        J=zeros((n,3,m))
+        for k in range(3):
+            dk=(residual(yc+eps*(col==k))[0]-d)/eps
+            J[:,1,col==k]+=dk[:,col==k]
+            J[:,0,1:][:,col[1:]==k]+=dk[:,:-1][:,col[1:]==k]
+            J[:,2,:-1][:,col[:-1]==k]+=dk[:,1:][:,col[:-1]==k]
+        step=zeros((n,m))
+        for j in range(n):
+            if (err[j]>tol and isfinite(J[j]).all()):
+                step[j]=solve_banded((1,1),J[j],d[j])
+        # Damped step : halved until the largest offset decreases
+        lam=ones((n,1))
+        for ls in range(10):
+            yn=yc-lam*step
+            dn,tn=residual(yn)
+            en=npabs(dn).max(axis=1)
+            ok=(en<err)|(err<=tol)
+            if (ok.all()):
+                break
+            lam=where(ok[:,None],lam,0.5*lam)
+        yc,d,t,err=where(ok[:,None],yn,yc),where(ok[:,None],dn,d),where(ok[:,None],tn,t),where(ok,en,err)
+    bad=~(isfinite(yc).all(axis=1)&isfinite(t).all(axis=1)&(err<=tol))
+    if (bad.any()):
+        raise ValueError("decompose : the camber line of the sections "+", ".join("{:d}".format(i) for i in arange(n)[bad])
+                         +" did not converge (largest offsets "+", ".join("{:.2e}".format(e) for e in err[bad])+")")
+    yc=concatenate((y0,yc,y1),axis=1)
+    # Trailing edge : half of the gap
+    yt=concatenate((zeros((n,1)),t,0.5*hypot(*(Q[:,0]-Q[:,-1]).T)[:,None]),axis=1)
+    if (single):
+        return x, yc[0], yt[0], LE[0], chord[0], angle[0]
+    return x, yc, yt, LE, chord, angle
+
+
+class DecomposedFoil(NACArep):
+    """ Foil given by a camber line and a thickness distribution (e.g. from decompose) :
+        yc is interpolated by a cubic spline of x and yt by a cubic spline of sqrt(x) (as the thickness forms of Series6) """
+
+    #Initialiser
+    def __init__(self,x,yc,yt,name="foil",TE_tol=1e-6):
+        """ Initialiser : locations x, camber line yc and half thickness yt at x, name of the foil and tolerance of the closed trailing edge """
+        from numpy import asarray, sqrt
+        from scipy import interpolate
+        from hashlib import sha256
+        self.x=asarray(x,dtype=float)
+        yc=asarray(yc,dtype=float)
+        yt=asarray(yt,dtype=float)
+        self.__name=name
+        self.digest=sha256(self.x.tobytes()+yc.tobytes()+yt.tobytes()).hexdigest()[:16]
+        self.ycSp=interpolate.CubicSpline(self.x,yc)
+        self.ytSp=interpolate.CubicSpline(sqrt(self.x),yt)
+        self.closed(TE_closed=bool(abs(self.ytSp(1.))<=TE_tol),LE_closed=True)
+
+    @classmethod
+    def from_points(cls,P,name="foil",x=None,npoints=101,normalized=False,TE_tol=1e-6):
+        """ Foil of the (N,2) points P of a section (see decompose), normalized to a unit chord on the x axis """
+        x,yc,yt,LE,chord,angle=decompose(P,x,npoints,normalized)
+        return cls(x,yc,yt,name,TE_tol)
+
+    # Visual Verifier of parameters
+    def show_parameters(self):
+        print("Decomposed foil : ",self.__name)
+        print("max camber=",self.ycSp(self.x).max())
+        print("max thickness=",2*self.ytSp(self.x**0.5).max())
+        self.printclosed()
+
+    # Name
+    def name(self):
+        """ Get the foils name """
+        return self.__name
+
+    # definition of camber line
+    def yc(self,x):
+        """ Compute y=Y/c values of the camber line """
+        return self.ycSp(x)
+
+    # definition of camber line derivative
+    def dyc(self,x):
+        """ Compute dy/dx(=dY/dX) values of the camber line (0<x<1) """
+        return self.ycSp(x,1)
+
+    # definition of camber line curvature (ddyc/sqrt(1+dyc**2))
+    def curv(self,x):
+        """ Compute d2y/dx2 values of the camber line (0<x<1) """
+        from numpy import sqrt
+        return self.ycSp(x,2)/sqrt(1+self.dyc(x)**2)**3
+
+    # definition of thickness
+    def yt(self,x):
+        from numpy import sqrt
+        return self.ytSp(sqrt(x))
+
+    # definition of thickness derivative
+    def dyt(self,x):
+        from numpy import sqrt
+        u=sqrt(x)
+        return self.ytSp(u,1)/(2*u)
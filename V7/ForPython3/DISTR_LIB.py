@@ -0,0 +1,269 @@
+### PART OF FOIL LIBRARY
+# 
+# Author: Konstantinos POLITIS
+# 
+#   Defines the spanwise distributions used to construct wings and blades 
+#   from foil sections (see FCFoil and NPFoil). 
+#   
+#   A distribution returns its value at the internal spanwise coordinate 
+#   zL (0<=zL<=1). The section generating distributions (NACA_const, WAGBS, 
+#   FILE_const) return a foil at zL.
+#   
+#   This module does not depend on FreeCAD.
+#   
+###
+from abc import ABC
+import abc
+
+class distribution(ABC):
+    """ Abstract Class Method for generating distribution functions """
+    @abc.abstractmethod
+    def at(self,zL):
+        pass
+    
+    def at_all(self,zL):
+        """ Values at all the locations zL : array of shape (len(zL),)+shape of a value (overload to vectorize) """
+        from numpy import asarray
+        return asarray([self.at(z) for z in zL],dtype=float)
+    
+def __zcol__(zL,c):
+    """ Array zL as a column broadcasting with the values c of a distribution """
+    from numpy import asarray
+    zL=asarray(zL,dtype=float)
+    return zL.reshape(zL.shape+(1,)*asarray(c).ndim)
+    
+class constant(distribution):
+    """ Constant distribution """
+    
+    def __init__(self,c):
+        self.c=c
+    
+    def at(self,zL):
+        return self.c
+    
+    def at_all(self,zL):
+        from numpy import asarray, zeros
+        c=asarray(self.c,dtype=float)
+        return c+zeros((len(zL),)+c.shape)
+    
+class linear(distribution): 
+    """ Linear distribution """
+    
+    def __init__(self,c1,c2):
+        self.c1=c1
+        self.c2=c2
+    
+    def at(self,zL):
+        return self.c1*(1-zL)+self.c2*zL
+    
+    def at_all(self,zL):
+        from numpy import asarray
+        c1=asarray(self.c1,dtype=float)
+        c2=asarray(self.c2,dtype=float)
+        z=__zcol__(zL,c1)
+        return c1*(1-z)+c2*z
+
+class line(distribution):
+    """ Line distribution """
+    
+    def __init__(self,p,u,L):
+        self.p=p
+        self.u=u
+        self.L=L
+    
+    def at(self,zL):
+        v=self.p+self.u*zL*self.L
+        return v
+    
+    def at_all(self,zL):
+        from numpy import asarray
+        p=asarray(self.p,dtype=float)
+        u=asarray(self.u,dtype=float)
+        return p+u*__zcol__(zL,p)*self.L
+
+class function(distribution):
+    """ Distribution given by a function f(zL) (e.g. the spline cR of a BseriesFoil), multiplied by factor. 
+        The function should accept arrays if the distribution is evaluated with at_all """
+    
+    def __init__(self,f,factor=1):
+        self.f=f
+        self.factor=factor
+    
+    def at(self,zL):
+        return self.factor*self.f(zL)
+    
+    def at_all(self,zL):
+        from numpy import asarray
+        return self.factor*asarray(self.f(asarray(zL,dtype=float)),dtype=float)
+
+class spline(distribution):
+    """ Spline distribution : interpolating spline of degree k (<= number of values - 1) through the values c at 
+        the locations zLs. The values can be vectors (c of shape (len(zLs),dim)) """
+    
+    def __init__(self,zLs,c,k=3):
+        from scipy.interpolate import make_interp_spline
+        self.spl=make_interp_spline(zLs,c,k=min(k,len(zLs)-1))
+    
+    def at(self,zL):
+        return self.spl(zL)
+    
+    def at_all(self,zL):
+        from numpy import asarray
+        return self.spl(asarray(zL,dtype=float))
+
+class table(distribution):
+    """ Table distribution : piecewise linear interpolation of the values c at the locations zLs (increasing), 
+        constant outside of the table. The values can be vectors (c of shape (len(zLs),dim)) """
+    
+    def __init__(self,zLs,c):
+        from numpy import asarray
+        self.zLs=asarray(zLs,dtype=float)
+        self.c=asarray(c,dtype=float)
+    
+    def at(self,zL):
+        return self.at_all([zL])[0]
+    
+    def at_all(self,zL):
+        from numpy import asarray, interp, stack
+        zL=asarray(zL,dtype=float)
+        if (self.c.ndim==1):
+            return interp(zL,self.zLs,self.c)
+        return stack([interp(zL,self.zLs,ci) for ci in self.c.T],axis=-1)
+
+class NACA_const(distribution):
+    
+    def __init__(self,code,params,TE_closed):
+        """ Foil Section Generating Class
+            Inputs :
+            -Specific for NACA 
+                code     : a four digit code representing the Series4 geometry, if it is set to "xxxx"  
+                (Digits = 1st digit : max camber, 2nd : location of max camber, 3rd-4rth : thickness) """
+        self.code=code
+        self.m=constant(params[0])
+        self.p=constant(params[1])
+        self.t=constant(params[2])
+        self.TE_closed=TE_closed
+        
+    def at(self,zL):
+        from NACA_LIB import NACA as NACAPicker
+        foil_section=NACAPicker(self.code,[self.m.at(zL),self.p.at(zL),self.t.at(zL)],self.TE_closed)
+        return foil_section
+    
+    
+class WAGBS(distribution):
+    
+    def __init__(self,Z,EAR,tLE,tTE,Smooth_LE,x0s,x0p,ks,kp):
+        """ Foil Section Generating Class
+            Inputs :  
+            -Specific for WAGENINGEN 
+                Z        : number of blades 
+                EAR      : expanded area ratio 
+                tLE      : thickness ratio (over tmax) at Leading Edge   
+                tTE      : thickness ratio (over tmax) at Trailing Edge 
+                Smooth_LE: if true smooths the leading edge   
+                x0s,x0p  : region of smoothing (suction and pressure) 
+                ks,kp    : smoothing index"""
+        self.Z=Z
+        self.EAR=EAR
+        self.tLE=tLE
+        self.tTE=tTE
+        self.Smooth_LE=Smooth_LE
+        self.x0s=x0s
+        self.x0p=x0p
+        self.ks=ks
+        self.kp=kp
+        
+        
+    def at(self,zL):
+        from WAGENINGEN_LIB import WAGENINGEN 
+        #self.s=WAGBS(Z,EAR,tLE_tmax=tLE_tmax,tTE_tmax=tTE_tmax,Smooth_LE=Smooth_LE,x0s=x0s,x0p=x0p,ks=ks,kp=kp)
+        foil_section=WAGENINGEN(self.Z,self.EAR,zL,tLE_tmax=self.tLE,tTE_tmax=self.tTE,Smooth_LE=self.Smooth_LE,x0s=self.x0s,x0p=self.x0p,ks=self.ks,kp=self.kp)
+        return foil_section
+    
+    def chord(self,R=1):
+        """ Chord distribution of the B-series blade of radius R (zL=r/R) : function distribution of the spline cR (c/R) """
+        from WAGENINGEN_LIB import WAGENINGEN 
+        return function(WAGENINGEN(self.Z,self.EAR,1,tLE_tmax=self.tLE,tTE_tmax=self.tTE).cR,R)
+    
+
+class FILE_const(distribution):
+    
+    def __init__(self,filename,database=None,TE_tol=1e-6):
+        """ Foil Section Generating Class
+            Inputs :
+            -Specific for foils read from file (see FILEFOIL_LIB)
+                filename : Selig or Lednicer file, or the name of the foil in the database
+                database : archive of a foil database (see FILEFOIL_LIB.build_database), None to read filename
+                TE_tol   : tolerance of the closed trailing edge """
+        self.filename=filename
+        self.database=database
+        self.TE_tol=TE_tol
+        self.__foil=None
+        
+    def at(self,zL):
+        # The same foil at all zL : read once
+        if (self.__foil is None):
+            from FILEFOIL_LIB import FileFoil, FoilDatabase
+            if (self.database is None):
+                self.__foil=FileFoil.from_file(self.filename,self.TE_tol)
+            else:
+                self.__foil=FoilDatabase(self.database).foil(self.filename,self.TE_tol)
+        return self.__foil
+    
+
+class sampled_foil:
+    """ Foil sampled once : keeps only the points of the sides, the tangent vectors and the name of a foil 
+        (cheap to pickle). The methods PressureSide_FCAD, SuctionSide_FCAD, vecS_LE, vecS_TE, vecS and name 
+        have the same interface as those of afoil (see FOIL), for the samplings requested. """
+    
+    def __init__(self,afoil,sampling):
+        """ Inputs : 
+                afoil    : the foil to sample
+                sampling : list of tuples (side,npoints,LE2TE,spacing) with side 'p'(ressure) or 's'(uction) """
+        self.__name=afoil.name()
+        self.TE_closed=afoil.TE_closed
+        self.LE_closed=afoil.LE_closed
+        self.__vecS_LE,self.__vecS_TE=afoil.vecS()
+        self.__sides={}
+        for side,npoints,LE2TE,spacing in sampling:
+            if (side=='p'):
+                self.__sides[side,npoints,LE2TE,spacing]=afoil.PressureSide_FCAD(npoints=npoints,LE2TE=LE2TE,spacing=spacing)
+            else:
+                self.__sides[side,npoints,LE2TE,spacing]=afoil.SuctionSide_FCAD(npoints=npoints,LE2TE=LE2TE,spacing=spacing)
+    
+    def SuctionSide_FCAD(self,npoints=30,LE2TE=True,spacing='linear'):
+        return self.__sides['s',npoints,LE2TE,spacing]
+    
+    def PressureSide_FCAD(self,npoints=30,LE2TE=False,spacing='linear'):
+        return self.__sides['p',npoints,LE2TE,spacing]
+    
+    def vecS_LE(self):
+        return self.__vecS_LE
+    
+    def vecS_TE(self):
+        return self.__vecS_TE
+    
+    def vecS(self):
+        return self.__vecS_LE, self.__vecS_TE
+    
+    def name(self):
+        return self.__name
+
+
+def sample_section(s,zL,sampling):
+    """ Returns the foil of the section generating distribution s at zL sampled as requested (see sampled_foil) """
+    return sampled_foil(s.at(zL),sampling)
+
+def sample_sections(s,zL,sampling,processes=None):
+    """ Samples the foils of the section generating distribution s at the spanwise locations zL in a pool of 
+        processes (processes=None uses all the cpus). Returns the list of sampled_foil (same order as zL). 
+        Note : inside FreeCAD the pool may require multiprocessing.set_executable (path of a python interpreter) """
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+    from os import cpu_count
+    zL=list(zL)
+    if (len(zL)==0):
+        return []
+    nw=min(processes or cpu_count() or 1,len(zL))
+    with ProcessPoolExecutor(nw) as pool:
+        return list(pool.map(partial(sample_section,s,sampling=sampling),zL,chunksize=max(1,len(zL)//(4*nw))))
@@ -11,7 +11,8 @@
 ###
 from FreeCAD import Base
 import FreeCAD
-from abc import ABC, abstractmethod
+from DISTR_LIB import distribution, constant, linear, line, function, spline, table, NACA_const, WAGBS, FILE_const, sample_sections
+from TIMER_LIB import StageTimer, notimer
 
 # Basic Definitions
 O =Base.Vector(0,0,0)
@@ -36,6 +37,9 @@ __N4cod_def__="xxxx"
 __NACA4_def__=[0,0,0.15]
 __TE_closed__=True
 
+# Foils read from file : tolerance of the closed trailing edge (fraction of chord)
+__TE_tol__=1e-6
+
 # The chord is zero if smaller than this value
 __c_is_zero__=1e-3
 
@@ -82,6 +86,7 @@ class Doc:
         self.p=line(p,-uz,L) 
         self.u=constant(u)
         self.n=constant(n)
+        self.timer=notimer
     
     
     # Initializer for .section 
@@ -96,11 +101,28 @@ class Doc:
         """ Define the foil section as a Wageningen section """
         self.s=WAGBS(Z,EAR,tLE_tmax,tTE_tmax,Smooth_LE,x0s,x0p,ks,kp)
 
+    def FILE(self,filename,database=None,TE_tol=__TE_tol__):
+        """ Define the foil section as a foil read from a Selig or Lednicer file (or by its name from a foil database, see FILEFOIL_LIB) """
+        self.s=FILE_const(filename,database,TE_tol)
+
     def n_sections(self,n_sections):
         self.ns=n_sections
     
+    def profile(self,enable=True,sections=False):
+        """ Times (enable=True) or not the stages of add (see TIMER_LIB), sections=True keeps the times of every section.
+            The timings of the following calls of add are returned by timings """
+        self.timer=StageTimer(sections) if enable else notimer
+    
+    def timings(self,filename=None):
+        """ Returns the timings of add as a dict (None if not profiled), written as JSON to filename if given """
+        if (self.timer is notimer):
+            return None
+        if (filename is not None):
+            self.timer.to_json(filename)
+        return self.timer.report()
+    
     
-    def add(self,nps=40,npp=40,Tvs=0,Tvp=0,zs=0,ze=1,spacing=__spacing_z__,here=False):
+    def add(self,nps=40,npp=40,Tvs=0,Tvp=0,zs=0,ze=1,spacing=__spacing_z__,here=False,processes=1):
         """ Creates a Named Foil Section as a Part:Feature Wire
         Input : 
             1. Afoil    : A foil section instance generated by a foil section generating function
@@ -116,10 +138,15 @@ class Doc:
             6. here     : logical : if true then the construction is added to the current document.
                                     The default value is false : the construction is performed at 
                                     the document generated by the FCFoil library
-            7. Draft    : logical : Create as drafts """
-        from numpy import linspace,cos,sign
+            7. Draft    : logical : Create as drafts 
+            8. processes: integer : number of processes used to construct the foils and sample their points/tangents 
+                                    (1 : serial, the default, None : all the cpus). Only the splines and the shapes
+                                    are constructed in the main process. """
+        from numpy import linspace,cos,sign,pi
         import Part
         import Draft
+        timer=self.timer
+        timer.start('add')
         # Construct array of z values 
         t=linspace(zs,ze,self.ns)
         if (spacing=='linear'):
@@ -127,22 +154,38 @@ class Doc:
         elif (spacing=='cos'):
             self.zL=1-cos(pi*t/2)
         
+        # Spanwise quantities at all the sections
+        with timer.stage('distributions'):
+            C=self.c.at_all(self.zL)
+            P=self.p.at_all(self.zL)
+            U=self.u.at_all(self.zL)
+            N=self.n.at_all(self.zL)
+            B=self.b.at_all(self.zL)
+        
+        # Sample the foils in a pool of processes 
+        if (processes!=1):
+            with timer.stage('pool'):
+                zLs=self.zL[C>__c_is_zero__]
+                samples=dict(zip(zLs,sample_sections(self.s,zLs,__sampling__(nps,npp),processes)))
+        
         # Bspline Construction
         stopnow=False
         i=-1
-        for zL in self.zL:
+        for i,zL in enumerate(self.zL):
             
-            if ( self.c.at(zL) <= __c_is_zero__ ):
+            timer.begin_section(zL)
+            if ( C[i] <= __c_is_zero__ ):
                 # Case of zero chord => add a vertex 
-                Add_this=Base.Vertex(self.p.at(zL))
+                Add_this=Base.Vertex(Base.Vector(*P[i]))
                 name = "Vertex:c=0"
                 
             else:
                 
                 ### Get foil section at zL
                 #    - Set the foil's geometry at the spamwise location zL
-                afoil=self.s.at(zL)
-                name=afoil.name()
+                with timer.stage('foil'):
+                    afoil=self.s.at(zL) if (processes==1) else samples[zL]
+                    name=afoil.name()
                 
                 ### Construct Drawing Shape for the Bsplines
                 #  
@@ -153,10 +196,11 @@ class Doc:
                 #  For the blade case we define cylinders
                 #  Note that other kind of surfaces can be used (cone, bsplinesurface etc)
                 #  but we use only planes and cylinders
-                p=self.p.at(zL)
-                u=self.u.at(zL)
-                n=self.n.at(zL)
-                b=self.b.at(zL)
+                timer.start('plane')
+                p=Base.Vector(*P[i])
+                u=Base.Vector(*U[i])
+                n=Base.Vector(*N[i])
+                b=float(B[i])
                 myMat=Base.Matrix()
                 myMat.move(-b*ux)
                 ucux=ux.cross(u)
@@ -165,6 +209,7 @@ class Doc:
                 myshape.transform(myMat)
                 # note : up to this point no scaling is applied. Scaling is applied to the 
                 #        struction afterwards 
+                timer.stop()
                 
                 if (npp==0) : # construction using one bspline will be used for the foil
                     # Implies that a single line will be used for the wire 
@@ -176,8 +221,9 @@ class Doc:
                     # For the case where the foil is not closed due to the LE then there is no need to add
                     # a straight line there to our construction
                     
-                    sp = __make_spline__(afoil,nps=nps,npp=nps,Tv=Tvs)
-                    sp.scale(Base.Vector2d(0,0),self.c.at(zL))
+                    sp = __make_spline__(afoil,nps=nps,npp=nps,Tv=Tvs,timer=timer)
+                    timer.start('toShape')
+                    sp.scale(Base.Vector2d(0,0),C[i])
                     
                     if (not afoil.TE_closed):
                         
@@ -192,9 +238,10 @@ class Doc:
                     
                 else: # classic two bspline construction will be used for the foil
                     
-                    spP,spS = __make_splines__(afoil,nps=nps,npp=npp,Tvp=Tvp,Tvs=Tvs)
-                    spP.scale(Base.Vector2d(0,0),self.c.at(zL))
-                    spS.scale(Base.Vector2d(0,0),self.c.at(zL))
+                    spP,spS = __make_splines__(afoil,nps=nps,npp=npp,Tvp=Tvp,Tvs=Tvs,timer=timer)
+                    timer.start('toShape')
+                    spP.scale(Base.Vector2d(0,0),C[i])
+                    spS.scale(Base.Vector2d(0,0),C[i])
                     
                     # Note : The following works only for the default orientation
                     # i.e. TE2LE
@@ -226,6 +273,8 @@ class Doc:
                         
                         Add_this=Part.Wire([spP.toShape(myshape),spS.toShape(myshape)])
                 
+                timer.stop()
+                
                 # Make transformations of internal geometry
                 #Add_this.translate(-self.u.at(zL)*self.b.at(zL))
                 #u=self.u.at(zL)
@@ -234,21 +283,32 @@ class Doc:
                 #Add_this.translate(self.p.at(zL))
                 #Add_this.scale(self.c.at(zL))
             
+            timer.start('addObject')
             if (not here): 
                 self.Docu.addObject("Part::Feature","zL={:.3f}:".format(zL)+name).Shape=Add_this
             else: 
                 Part.show(Add_this,"zL={:.3f}:".format(zL)+name)
+            timer.stop()
+            timer.end_section(name)
             
+        timer.stop()
         
         
 ###
 # Functions for working with FreeCAD
 #
 
-def __make_spline__(afoil,nps=40,npp=40,Tv=1):
+def __sampling__(nps,npp):
+    """ Sides of a foil sampled by __make_spline__ (npp=0) or __make_splines__ (see DISTR_LIB.sampled_foil) """
+    if (npp==0):
+        return [('p',nps,False,__spacing__),('s',nps,True,__spacing__)]
+    return [('p',npp,__LE2TEp__,__spacing__),('s',nps,__LE2TEs__,__spacing__)]
+
+def __make_spline__(afoil,nps=40,npp=40,Tv=1,timer=notimer):
     """ Return the spline of the Pressure-Suction side of a foil """
     import Part
     
+    timer.start('sample')
     xpres,ypres,zpres,t=afoil.PressureSide_FCAD(npoints=npp,spacing=__spacing__)
     xsuc,ysuc,zsuc,t=afoil.SuctionSide_FCAD(npoints=nps,spacing=__spacing__)
 
@@ -257,8 +317,10 @@ def __make_spline__(afoil,nps=40,npp=40,Tv=1):
     #V.extend([Base.Vector(xsuc[i],ysuc[i],zsuc[i]) for i in range(len(xsuc))]) 
     V=[Base.Vector2d(xpres[i],ypres[i]) for i in range(len(xpres)-1)] 
     V.extend([Base.Vector2d(xsuc[i],ysuc[i]) for i in range(len(xsuc))]) 
+    timer.stop()
           
     # Setup FreeCAD Spline (one spline)
+    timer.start('interpolate')
     sp=Part.Geom2d.BSplineCurve2d()
     
     # Note : By 
@@ -266,7 +328,7 @@ def __make_spline__(afoil,nps=40,npp=40,Tv=1):
     if (Tv):
         
         # Get tangent vector at trailing edge
-        vecTE=afoil.vecS_TE()
+        vecTE=afoil.vecS()[1]
         vTEp = Base.Vector2d(vecTE[0],vecTE[1])
         vTEs = Base.Vector2d(vecTE[2],vecTE[3])
         
@@ -275,12 +337,14 @@ def __make_spline__(afoil,nps=40,npp=40,Tv=1):
         
     else:
         sp.interpolate(V)
+    timer.stop()
     
     return sp
 
-def __make_splines__(afoil,nps=40,npp=40,Tvp=1,Tvs=1):
+def __make_splines__(afoil,nps=40,npp=40,Tvp=1,Tvs=1,timer=notimer):
     """ Returns the splines of the Pressure and Suction side of a foil """
     import Part
+    timer.start('sample')
     xpres,ypres,zpres,tp=afoil.PressureSide_FCAD(npoints=npp,spacing=__spacing__,LE2TE=__LE2TEp__)
     xsuc,ysuc,zsuc,ts=afoil.SuctionSide_FCAD(npoints=nps,spacing=__spacing__,LE2TE=__LE2TEs__)
 
@@ -288,12 +352,13 @@ def __make_splines__(afoil,nps=40,npp=40,Tvp=1,Tvs=1):
     #Vs=[Base.Vector(xsuc[i],ysuc[i],zsuc[i]) for i in range(len(xsuc))] 
     Vp=[Base.Vector2d(xpres[i],ypres[i]) for i in range(len(xpres))] 
     Vs=[Base.Vector2d(xsuc[i],ysuc[i]) for i in range(len(xsuc))] 
+    timer.stop()
     
+    timer.start('interpolate')
     if (Tvp or Tvs):
         
         # Get tangent vector at leading/trailing edge
-        vecLE=afoil.vecS_LE()
-        vecTE=afoil.vecS_TE()
+        vecLE,vecTE=afoil.vecS()
         
         # Arrange Data
         #vLEp = Base.Vector(vecLE[0],vecLE[1],0)
@@ -353,6 +418,7 @@ def __make_splines__(afoil,nps=40,npp=40,Tvp=1,Tvs=1):
             
         else:
             spS.interpolate(Vs)
+    timer.stop()
         
     return spP,spS
 
@@ -369,8 +435,7 @@ def __makedraft_splines__(afoil,nps=40,npp=40,Tvp=1,Tvs=1):
     if (Tvp or Tvs):
         
         # Get tangent vector at leading/trailing edge
-        vecLE=afoil.vecS_LE()
-        vecTE=afoil.vecS_TE()
+        vecLE,vecTE=afoil.vecS()
         
         # Arrange Data
         vLEp = Base.Vector(vecLE[0],vecLE[1],0)
@@ -429,93 +494,6 @@ def __makedraft_splines__(afoil,nps=40,npp=40,Tvp=1,Tvs=1):
 ###
 
 
-class distribution(ABC):
-    """ Abstract Class Method for generating distribution functions """
-    @abc.abstractmethod
-    def at(self,zL):
-        pass
-    
-class constant(distribution):
-    """ Constant distribution """
-    
-    def __init__(self,c):
-        self.c=c
-    
-    def at(self,zL):
-        return self.c
-    
-class linear(distribution): 
-    """ Linear distribution """
-    
-    def __init__(self,c1,c2):
-        self.c1=c1
-        self.c2=c2
-    
-    def at(self,zL):
-        return self.c1*(1-zL)+self.c2*zL
-
-class line(distribution):
-    """ Line distribution """
-    
-    def __init__(self,p,u,L):
-        self.p=p
-        self.u=u
-        self.L=L
-    
-    def at(self,zL):
-        v=self.p+self.u*zL*self.L
-        return v
-
-class NACA_const(distribution):
-    
-    def __init__(self,code,params,TE_closed):
-        """ Foil Section Generating Class
-            Inputs :
-            -Specific for NACA 
-                code     : a four digit code representing the Series4 geometry, if it is set to "xxxx"  
-                (Digits = 1st digit : max camber, 2nd : location of max camber, 3rd-4rth : thickness) """
-        self.code=code
-        self.m=constant(params[0])
-        self.p=constant(params[1])
-        self.t=constant(params[2])
-        self.TE_closed=TE_closed
-        
-    def at(self,zL):
-        from NACA_LIB import NACA as NACAPicker
-        foil_section=NACAPicker(self.code,[self.m.at(zL),self.p.at(zL),self.t.at(zL)],self.TE_closed)
-        return foil_section
-    
-    
-class WAGBS(distribution):
-    
-    def __init__(self,Z,EAR,tLE,tTE,Smooth_LE,x0s,x0p,ks,kp):
-        """ Foil Section Generating Class
-            Inputs :  
-            -Specific for WAGENINGEN 
-                Z        : number of blades 
-                EAR      : expanded area ratio 
-                tLE      : thickness ratio (over tmax) at Leading Edge   
-                tTE      : thickness ratio (over tmax) at Trailing Edge 
-                Smooth_LE: if true smooths the leading edge   
-                x0s,x0p  : region of smoothing (suction and pressure) 
-                ks,kp    : smoothing index"""
-        self.Z=Z
-        self.EAR=EAR
-        self.tLE=tLE
-        self.tTE=tTE
-        self.Smooth_LE=Smooth_LE
-        self.x0s=x0s
-        self.x0p=x0p
-        self.ks=ks
-        self.kp=kp
-        
-        
-    def at(self,zL):
-        from WAGENINGEN_LIB import WAGENINGEN 
-        #self.s=WAGBS(Z,EAR,tLE_tmax=tLE_tmax,tTE_tmax=tTE_tmax,Smooth_LE=Smooth_LE,x0s=x0s,x0p=x0p,ks=ks,kp=kp)
-        foil_section=WAGENINGEN(self.Z,self.EAR,zL,tLE_tmax=self.tLE,tTE_tmax=self.tTE,Smooth_LE=self.Smooth_LE,x0s=self.x0s,x0p=self.x0p,ks=self.ks,kp=self.kp)
-        return foil_section
-
 def README():
     """ Help """
     instru='''
@@ -0,0 +1,312 @@
+### PART OF FOIL LIBRARY
+#
+# Author: Konstantinos POLITIS
+#
+#   Defines a Specific Instance of Foil : foils read from coordinate files (.dat)
+#
+#   Formats :
+#     Selig    : name line, then the X Y points from the trailing edge over the upper side
+#                to the leading edge and back to the trailing edge over the lower side
+#     Lednicer : name line, a line with the number of points of the upper and lower sides,
+#                then the upper side and the lower side, both from the leading to the trailing edge
+#
+#   The points are normalized : the leading edge (the point of minimum X) is moved to the
+#   origin and the coordinates are divided by the chord (the foil is not rotated). Each side
+#   is interpolated by a monotone cubic (PCHIP) of u=sqrt(x), as the thickness of a round
+#   leading edge behaves as sqrt(x).
+#
+#   Foil database : build_database packs many .dat files into one binary archive (.npy, read
+#   memory-mapped) and a sorted name index (.idx.npy), so that a foil is found by a binary
+#   search of the index and read without parsing text (see FoilDatabase).
+#
+#   Example :
+#        afoil=FileFoil.from_file("e387.dat")
+#        build_database(glob.glob("coord_seligFmt/*.dat"),"uiuc.npy")
+#        afoil=FoilDatabase("uiuc.npy").foil("e387")
+#
+###
+from FOIL import afoil as foil
+
+def parse_dat(text):
+    """ Parses the text of a Selig or Lednicer file : returns the title and the (n,2) arrays of the upper and lower sides,
+        both from the leading edge to the trailing edge (original units) """
+    from numpy import array, argmin
+    lines=text.splitlines()
+    title=lines[0].strip() if (lines) else ""
+    P=[]
+    for line in lines[1:]:
+        v=line.replace(',',' ').split()
+        if (len(v)<2):
+            continue
+        try:
+            P.append((float(v[0]),float(v[1])))
+        except ValueError:
+            continue
+    if (len(P)<3):
+        raise ValueError("Foil file : less than 3 points in "+repr(title))
+    P=array(P)
+    # Lednicer : the first line gives the number of points of the sides (not coordinates of a normalized foil)
+    nu,nl=P[0]
+    if (nu>1.5 and nl>1.5 and nu==int(nu) and nl==int(nl)):
+        nu,nl=int(nu),int(nl)
+        if (len(P)<1+nu+nl):
+            raise ValueError("Foil file : Lednicer format with {:d}+{:d} points but {:d} points found in ".format(nu,nl,len(P)-1)+repr(title))
+        upper=P[1:1+nu]
+        lower=P[1+nu:1+nu+nl]
+    else:
+        # Selig : split at the leading edge
+        i=argmin(P[:,0])
+        upper=P[:i+1][::-1]
+        lower=P[i:]
+        # Lower side given first
+        if (upper[:,1].mean()<lower[:,1].mean()):
+            upper,lower=lower,upper
+    if (len(upper)<2 or len(lower)<2):
+        raise ValueError("Foil file : a side has less than 2 points in "+repr(title))
+    return title, upper, lower
+
+def read_dat(filename):
+    """ Reads a Selig or Lednicer file : returns the title and the (n,2) arrays of the upper and lower sides (see parse_dat) """
+    with open(filename,errors='replace') as f:
+        return parse_dat(f.read())
+
+def FILEFOIL(filename,TE_tol=1e-6):
+    """ FILEFOIL Picker : the foil of a Selig or Lednicer file (see FileFoil) """
+    return FileFoil.from_file(filename,TE_tol)
+
+
+class FileFoil(foil):
+    """ Foil given by the points of its upper (suction) and lower (pressure) sides
+        x=X/c is the parameter of both sides : Xs(x)=Xp(x)=x """
+
+    #Initialiser
+    def __init__(self,upper,lower,name="foil",title=None,TE_tol=1e-6):
+        """ Initialiser : upper, lower (n,2) arrays of the X,Y points of the sides from the leading edge to the trailing edge,
+            name of the foil, title (the first line of its file) and tolerance of the closed trailing edge (fraction of chord) """
+        from numpy import asarray
+        from hashlib import sha256
+        upper=asarray(upper,dtype=float)
+        lower=asarray(lower,dtype=float)
+        # Leading edge, chord
+        LE=upper[0] if (upper[0,0]<=lower[0,0]) else lower[0]
+        c=max(upper[:,0].max(),lower[:,0].max())-LE[0]
+        if (not c>0):
+            raise ValueError("FileFoil : zero chord for "+name)
+        self.__name=name
+        self.title=name if (title is None) else title
+        self.chord=float(c)
+        self.digest=sha256(upper.tobytes()+lower.tobytes()).hexdigest()[:16]
+        self.upper=(upper-LE)/c
+        self.lower=(lower-LE)/c
+        self.ysSp=self.__side(self.upper)
+        self.ypSp=self.__side(self.lower)
+        self.closed(TE_closed=bool(abs(self.ysSp(1.)-self.ypSp(1.))<=TE_tol),LE_closed=True)
+
+    @staticmethod
+    def __side(P):
+        """ Interpolant y(u=sqrt(x)) of the points P of a side (the points not increasing in x are removed) """
+        from numpy import sqrt, maximum, concatenate, clip
+        from scipy.interpolate import PchipInterpolator
+        x=P[:,0]
+        keep=concatenate(([True],x[1:]>maximum.accumulate(x)[:-1]))
+        # The leading edge of the side at x=0
+        if (x[0]>0):
+            P=concatenate(([[0,P[0,1]]],P))
+            keep=concatenate(([True],keep))
+        P=P[keep]
+        if (len(P)<2):
+            raise ValueError("FileFoil : a side has less than 2 points increasing in x")
+        return PchipInterpolator(sqrt(clip(P[:,0],0,None)),P[:,1],extrapolate=True)
+
+    @classmethod
+    def from_text(cls,text,name=None,TE_tol=1e-6):
+        """ Foil of the text of a Selig or Lednicer file (name : default the title) """
+        title,upper,lower=parse_dat(text)
+        return cls(upper,lower,title if (name is None) else name,title,TE_tol)
+
+    @classmethod
+    def from_file(cls,filename,TE_tol=1e-6):
+        """ Foil of a Selig or Lednicer file, named by the file name without extension """
+        import os
+        title,upper,lower=read_dat(filename)
+        return cls(upper,lower,os.path.splitext(os.path.basename(filename))[0],title,TE_tol)
+
+    # Visual Verifier of parameters
+    def show_parameters(self):
+        print("Foil from file : ",self.__name)
+        print("title=",self.title)
+        print("points (upper, lower)=",len(self.upper),len(self.lower))
+        print("chord (file units)=",self.chord)
+        self.printclosed()
+
+    # Name
+    def name(self):
+        """ Get the foils name """
+        return self.__name
+
+    def Xs(self,x):
+        """ Suction side (X/c above coordinate)"""
+        from numpy import asarray
+        return asarray(x,dtype=float)
+
+    def Ys(self,x):
+        """ Suction side (Y/c above coordinate)"""
+        from numpy import sqrt
+        return self.ysSp(sqrt(x))
+
+    def Zs(self,x):
+        """ Suction side (Z/c above coordinate)"""
+        val=0*x
+        return val
+
+    def Xp(self,x):
+        """ Pressure side (X/c below coordinate)"""
+        from numpy import asarray
+        return asarray(x,dtype=float)
+
+    def Yp(self,x):
+        """ Pressure side (Y/c below coordinate)"""
+        from numpy import sqrt
+        return self.ypSp(sqrt(x))
+
+    def Zp(self,x):
+        """ Pressure side (Z/c below coordinate)"""
+        val=0*x
+        return val
+
+    def compute_surfaces(self,x):
+        """ Suction and pressure side coordinates (Xs,Ys,Xp,Yp) at x (one square root) """
+        from numpy import sqrt, asarray
+        x=asarray(x,dtype=float)
+        u=sqrt(x)
+        return x, self.ysSp(u), x, self.ypSp(u)
+
+    def vecS_TE(self):
+        """ Tangent at TE at pressure and suction (orientation from pressure to suction - towards LE and back to TE towards wake) """
+        from numpy import sqrt
+        # dX/du=2 at u=1
+        dys=float(self.ysSp(1.,1))
+        dyp=float(self.ypSp(1.,1))
+        ls=sqrt(4+dys**2)
+        lp=sqrt(4+dyp**2)
+        return [-2/lp, -dyp/lp, 2/ls, dys/ls]
+
+    def vecS_LE(self):
+        """ Tangent at LE (orientation from pressure to suction) """
+        from numpy import sqrt
+        # dX/du=0 at u=0 : the tangent is vertical if dY/du is not zero (round leading edge), otherwise
+        # the direction of (d2X/du2, d2Y/du2)=(2, d2Y/du2) (sharp leading edge)
+        A=[]
+        for sp,sign in ((self.ypSp,-1),(self.ysSp,1)):
+            dy=float(sp(0.,1))
+            if (abs(dy)>1e-8):
+                vx,vy=0.,1. if (dy>0) else -1.
+            else:
+                d2y=float(sp(0.,2))
+                l=sqrt(4+d2y**2)
+                vx,vy=2/l,d2y/l
+            A+=[sign*vx,sign*vy]
+        return A
+
+
+###
+# Foil database : many foils in one memory-mapped archive
+#
+
+def build_database(files,archive,TE_tol=1e-6):
+    """ Packs the Selig or Lednicer files into the archive (a .npy file of all the normalized points, read memory-mapped)
+        and its index archive[:-4]+'.idx.npy' (name, title, first point, number of points of the upper and lower sides)
+        sorted by name. A foil is named by its file name without extension (the last file of a name is kept).
+        Returns the list of (file, error message) of the files that could not be read """
+    from numpy import concatenate, zeros, save, empty
+    foils={}
+    failed=[]
+    for filename in files:
+        try:
+            f=FileFoil.from_file(filename,TE_tol)
+        except (ValueError,OSError) as e:
+            failed.append((filename,str(e)))
+            continue
+        foils[f.name()]=f
+    names=sorted(foils)
+    L=max([len(n) for n in names]+[1])
+    T=max([len(foils[n].title) for n in names]+[1])
+    index=zeros(len(names),dtype=[('name','U{:d}'.format(L)),('title','U{:d}'.format(T)),('start','<i8'),('nu','<i4'),('nl','<i4')])
+    start=0
+    for i,n in enumerate(names):
+        f=foils[n]
+        index[i]=(n,f.title,start,len(f.upper),len(f.lower))
+        start+=len(f.upper)+len(f.lower)
+    P=concatenate([concatenate((foils[n].upper,foils[n].lower)) for n in names]) if (names) else empty((0,2))
+    save(archive,P)
+    save(__index_file__(archive),index)
+    return failed
+
+def __index_file__(archive):
+    """ Name of the index of archive """
+    return (archive[:-4] if (archive.endswith('.npy')) else archive)+'.idx.npy'
+
+
+class FoilDatabase:
+    """ Foils of an archive written by build_database : the points and the index are memory-mapped (only the
+        pages of the foils read are loaded) """
+
+    def __init__(self,archive):
+        from numpy import load
+        self.archive=archive
+        self.points=load(archive,mmap_mode='r')
+        self.index=load(__index_file__(archive),mmap_mode='r')
+
+    def __len__(self):
+        return len(self.index)
+
+    def names(self):
+        """ Names of the foils (sorted) """
+        return self.index['name'].tolist()
+
+    def find(self,name):
+        """ Position of the foil name in the index (binary search), None if not found """
+        from numpy import searchsorted
+        names=self.index['name']
+        i=int(searchsorted(names,name))
+        if (i<len(names) and names[i]==name):
+            return i
+        return None
+
+    def __contains__(self,name):
+        return self.find(name) is not None
+
+    def coordinates(self,name):
+        """ Normalized points (upper, lower) of the foil name (or of its position in the index), from the leading edge to the trailing edge """
+        from numpy import array
+        i=name if isinstance(name,int) else self.find(name)
+        if (i is None):
+            raise KeyError(name)
+        e=self.index[i]
+        s,nu,nl=int(e['start']),int(e['nu']),int(e['nl'])
+        return array(self.points[s:s+nu]), array(self.points[s+nu:s+nu+nl])
+
+    def foil(self,name,TE_tol=1e-6):
+        """ FileFoil of the foil name (or of its position in the index) """
+        i=name if isinstance(name,int) else self.find(name)
+        if (i is None):
+            raise KeyError(name)
+        upper,lower=self.coordinates(i)
+        return FileFoil(upper,lower,str(self.index[i]['name']),str(self.index[i]['title']),TE_tol)
+
+    __getitem__=foil
+
+#
+# END : Foil database
+###
+
+if __name__=="__main__":
+    # Bulk import : python FILEFOIL_LIB.py archive.npy file1.dat file2.dat ... (or a directory of .dat files)
+    import sys, os, glob
+    files=[]
+    for a in sys.argv[2:]:
+        files+=sorted(glob.glob(os.path.join(a,"*.dat"))) if (os.path.isdir(a)) else [a]
+    failed=build_database(files,sys.argv[1])
+    for filename,e in failed:
+        print("Not imported :",filename,":",e)
+    print(len(FoilDatabase(sys.argv[1])),"foils in",sys.argv[1])
@@ -11,10 +11,10 @@
 #   not specified here. 
 #   
 #   A specific implementation of a foil is the NACA foil (see NACA_LIB)
+#   Foils read from Selig or Lednicer files are defined in FILEFOIL_LIB
 #   
 #  To do list : 
-#    - Add other family of foils :
-#                 1. Foils read from file 
+#    - Add other family of foils (foils read from file : see FILEFOIL_LIB)
 #                 
 #    - Provide extensions for complicated 3D foil geometries (more FreeCAD interaction) 
 #    - Initially the subroutine that generate points for FreeCAD used 20 points. Some ugly
@@ -25,10 +25,39 @@
 ####Features of 3.7 that do not work with Python 2.7 : 
 # 1. from abc import ABC, abstractmethod : requires six
 import abc
+import os
+
+### Disk cache of the sampled sides and of the tangent vectors (see CACHE_LIB) : not used by default
+# It is enabled by enable_disk_cache or, for all the processes, by the environment variable FOIL_CACHE_DIR
+disk_cache=None
+
+def enable_disk_cache(directory=None,max_bytes=None):
+    """ Keep the sides sampled by SuctionSide_FCAD/PressureSide_FCAD and the tangent vectors (vecS) in the directory
+        (default : FOIL_CACHE_DIR or ~/.cache/PEE_PythonFoils) of size max_bytes at most. Returns the DiskCache """
+    global disk_cache
+    from CACHE_LIB import DiskCache
+    disk_cache=DiskCache(directory) if (max_bytes is None) else DiskCache(directory,max_bytes)
+    return disk_cache
+
+def disable_disk_cache():
+    """ Stop using the disk cache (the files are kept) """
+    global disk_cache
+    disk_cache=None
 
 
 class afoil(abc.ABC):
     
+    # Memo of the surfaces (see memo_surfaces) : not used by default
+    surfaces_memo=None
+    
+    # Spacing 'adaptive' (see adaptive_x) : tolerance and maximum spacing (fractions of chord)
+    adaptive_tol=1e-4
+    adaptive_hmax=0.1
+    adaptive_memo=None
+    
+    # Attributes that are not parameters of the foil (see CACHE_LIB.parameters)
+    cache_ignore=('nmemo','surfaces_memo','adaptive_memo')
+    
     @abc.abstractmethod
     def Xs(self,x):
         """ Suction side (X/c above coordinate)"""
@@ -108,8 +137,107 @@ class afoil(abc.ABC):
             else:
                 print("Open Trailing Edge")
     
-    def SuctionSide_FCAD(self,npoints=30,LE2TE=True,spacing='linear'):
-        """ Generates lists of npoints (default=20) as X,Y coordinates to define FreeCAD base vectors for the suction side (oriented from LE to TE) """
+    def surfaces(self,x):
+        """ Suction and pressure side coordinates (Xs,Ys,Xp,Yp) at x """
+        if (self.surfaces_memo is None):
+            return self.compute_surfaces(x)
+        from numpy import asarray
+        xa=asarray(x)
+        key=(xa.dtype.str,xa.shape,xa.tobytes())
+        if (key in self.surfaces_memo):
+            return self.surfaces_memo[key]
+        S=self.compute_surfaces(x)
+        if (len(self.surfaces_memo)>=self.nmemo):
+            self.surfaces_memo.pop(next(iter(self.surfaces_memo)))
+        self.surfaces_memo[key]=S
+        return S
+    
+    def compute_surfaces(self,x):
+        """ Computes the suction and pressure side coordinates (Xs,Ys,Xp,Yp) at x (overload when the sides share computations) """
+        return self.Xs(x), self.Ys(x), self.Xp(x), self.Yp(x)
+    
+    def __shared_surfaces(self):
+        """ True if one side is obtained faster with the two sides from surfaces : compute_surfaces is overloaded or the memo is used """
+        return (self.surfaces_memo is not None or type(self).compute_surfaces is not afoil.compute_surfaces)
+    
+    def memo_surfaces(self,memo=True,nmemo=4):
+        """ Keep (memo=True) or not (memo=False) the surfaces computed for the last nmemo grids x 
+            Note : the arrays of the memo are returned as they are, they should not be modified """
+        self.surfaces_memo={} if memo else None
+        self.nmemo=nmemo
+    
+    def adaptive_x(self,tol=None,hmax=None,nfine=2001):
+        """ Chordwise locations x (increasing from 0 to 1) of the spacing 'adaptive' : the fewest points such that the 
+            polygons of the suction and pressure sides deviate from the foil by less than tol (fraction of chord) 
+            and the distance of consecutive points is at most hmax (by default adaptive_tol and adaptive_hmax)
+            Note : the curvature is computed from the sides evaluated at nfine points (the result is kept for the last tol, hmax)
+                   with the spacing 'adaptive' npoints is not used """
+        from numpy import linspace, cos, pi, concatenate, arctan2, sqrt, maximum, cumsum, interp, ceil, diff, abs as npabs
+        tol=self.adaptive_tol if (tol is None) else tol
+        hmax=self.adaptive_hmax if (hmax is None) else hmax
+        key=(tol,hmax,nfine)
+        if (self.adaptive_memo is not None and self.adaptive_memo[0]==key):
+            return self.adaptive_memo[1]
+        # Fine grid clustered at the leading edge
+        t=linspace(0,1,nfine)
+        xf=1-cos(pi*t/2)
+        Xs,Ys,Xp,Yp=self.surfaces(xf)
+        # Closed polygon : pressure side from TE to LE then suction side from LE to TE 
+        X=concatenate((Xp[::-1],Xs[1:]))
+        Y=concatenate((Yp[::-1],Ys[1:]))
+        dX,dY=diff(X),diff(Y)
+        L=sqrt(dX**2+dY**2)
+        # Curvature at the vertices : turning angle over the mean length of the neighbouring segments 
+        a=arctan2(dY,dX)
+        da=npabs((diff(a)+pi)%(2*pi)-pi)
+        k=concatenate(([0],da/maximum(0.5*(L[1:]+L[:-1]),1e-300),[0]))
+        # Points per segment : sagitta of a chord h on a curvature k is k h^2/8 
+        n=maximum(L*sqrt(maximum(k[1:],k[:-1])/(8*tol)),L/hmax)
+        # Same x on both sides : the largest number of points of the two sides for each interval of the fine grid
+        m=nfine-1
+        n=maximum(n[:m][::-1],n[m:])
+        N=cumsum(concatenate(([0],n)))
+        npoints=max(int(ceil(N[-1])),1)+1
+        x=interp(linspace(0,N[-1],npoints),N,xf)
+        x[0],x[-1]=0.,1.
+        self.adaptive_memo=(key,x)
+        return x
+    
+    def vecS(self):
+        """ Tangent vectors vecS_LE(), vecS_TE() (taken from the disk cache if enabled) """
+        if (disk_cache is None):
+            return self.vecS_LE(), self.vecS_TE()
+        from numpy import asarray
+        from CACHE_LIB import key_of
+        key=key_of(self,'vecS')
+        if (key is None):
+            return self.vecS_LE(), self.vecS_TE()
+        E=disk_cache.get_or_compute(key,lambda: dict(LE=asarray(self.vecS_LE(),dtype=float),TE=asarray(self.vecS_TE(),dtype=float)))
+        return E['LE'].tolist(), E['TE'].tolist()
+    
+    def __cached_side(self,side,npoints,LE2TE,spacing):
+        """ Side 's' or 'p' sampled by SuctionSide_FCAD/PressureSide_FCAD, taken from the disk cache (if the foil can be cached) """
+        from numpy import asarray
+        from CACHE_LIB import key_of
+        sample=self.SuctionSide_FCAD if (side=='s') else self.PressureSide_FCAD
+        args=(side,npoints,LE2TE,spacing)
+        if (spacing=='adaptive'):
+            args+=(self.adaptive_tol,self.adaptive_hmax)
+        key=key_of(self,*args)
+        if (key is None):
+            return sample(npoints,LE2TE,spacing,cached=False)
+        def compute():
+            X,Y,Z,t=sample(npoints,LE2TE,spacing,cached=False)
+            return dict(X=X,Y=Y,Z=asarray(Z,dtype=float),t=t)
+        E=disk_cache.get_or_compute(key,compute)
+        Z=E['Z']
+        return E['X'], E['Y'], (Z.item() if (Z.ndim==0) else Z), E['t']
+    
+    def SuctionSide_FCAD(self,npoints=30,LE2TE=True,spacing='linear',cached=True):
+        """ Generates lists of npoints (default=20) as X,Y coordinates to define FreeCAD base vectors for the suction side (oriented from LE to TE) 
+            (taken from the disk cache if enabled and cached is True) """
+        if (cached and disk_cache is not None):
+            return self.__cached_side('s',npoints,LE2TE,spacing)
         from numpy import linspace,cos,pi
         if (LE2TE):
             ts,te=0,1
@@ -120,15 +248,23 @@ class afoil(abc.ABC):
             x=t
         elif (spacing=='cos'):
             x=1-cos(pi*t/2)
+        elif (spacing=='adaptive'):
+            x=self.adaptive_x() if (LE2TE) else self.adaptive_x()[::-1]
         if (LE2TE):
             params=x
         else:
             params=1-x
+        if (self.__shared_surfaces()):
+            Xs,Ys,Xp,Yp=self.surfaces(x)
+            return Xs, Ys, self.Zs(x), params
         return self.Xs(x), self.Ys(x), self.Zs(x), params
         
     
-    def PressureSide_FCAD(self,npoints=30,LE2TE=False,spacing='linear'):
-        """ Generates lists of npoints (default=20) as X,Y coordinates to define FreeCAD base vectors for the suction side (oriented from LE to TE) """
+    def PressureSide_FCAD(self,npoints=30,LE2TE=False,spacing='linear',cached=True):
+        """ Generates lists of npoints (default=20) as X,Y coordinates to define FreeCAD base vectors for the suction side (oriented from LE to TE) 
+            (taken from the disk cache if enabled and cached is True) """
+        if (cached and disk_cache is not None):
+            return self.__cached_side('p',npoints,LE2TE,spacing)
         from numpy import linspace,cos,pi
         if (LE2TE):
             ts,te=0,1
@@ -139,10 +275,15 @@ class afoil(abc.ABC):
             x=t
         elif (spacing=='cos'):
             x=1-cos(pi*t/2)
+        elif (spacing=='adaptive'):
+            x=self.adaptive_x() if (LE2TE) else self.adaptive_x()[::-1]
         if (LE2TE):
             params=x
         else:
             params=1-x
+        if (self.__shared_surfaces()):
+            Xs,Ys,Xp,Yp=self.surfaces(x)
+            return Xp, Yp, self.Zp(x), params
         return self.Xp(x), self.Yp(x), self.Zp(x), params
     
         
@@ -157,10 +298,13 @@ class afoil(abc.ABC):
             x=1-cos(pi*t/2)
         elif (spacing=='sqrt'):
             x=1-sqrt(t)
+        elif (spacing=='adaptive'):
+            x=self.adaptive_x()
         #plt.plot(self.Xs(x),self.Ys(x),'bo',markersize=1.5,label='Suction Side')
         #plt.plot(self.Xp(x),self.Yp(x),'ro',markersize=1.5,label='Pressure Side')
-        plt.plot(self.Xs(x),self.Ys(x),'b-o',label='Suction Side')
-        plt.plot(self.Xp(x),self.Yp(x),'r-o',label='Pressure Side')
+        Xs,Ys,Xp,Yp=self.surfaces(x)
+        plt.plot(Xs,Ys,'b-o',label='Suction Side')
+        plt.plot(Xp,Yp,'r-o',label='Pressure Side')
         print("Distance from Suction to Pressure at LE = ",self.Ys(0)-self.Yp(0))
         print("Distance from Suction to Pressure at TE = ",self.Ys(1)-self.Yp(1))
         plt.xlabel('X/c')
@@ -181,16 +325,10 @@ class afoil(abc.ABC):
             plt.quiver(Xs,Ys,Us,Vs,width=0.002)
         return plt
     
-    def write4Xfoil(self,npoints=20,spacing='cos'):
-        from numpy import linspace, concatenate, savetxt, stack, pi, cos, sqrt
-        t=linspace(1,0,npoints)
-        if (spacing=='linear'):
-            x=t
-        elif (spacing=='cos'):
-            x=1-cos(pi*t/2)
-        elif (spacing=='sqrt'):
-            x=1-sqrt(t)
-        Xp, Yp = self.Xp(x),self.Yp(x)
+    def points4Xfoil(self,npoints=20,spacing='cos'):
+        """ Returns the (2*npoints,2) array of the X,Y coordinates written by write4Xfoil 
+            (pressure side from TE to LE and then suction side from LE to TE) """
+        from numpy import linspace, concatenate, stack, pi, cos, sqrt
         t=linspace(0,1,npoints)
         if (spacing=='linear'):
             x=t
@@ -198,10 +336,128 @@ class afoil(abc.ABC):
             x=1-cos(pi*t/2)
         elif (spacing=='sqrt'):
             x=1-sqrt(t)
-        Xs, Ys = self.Xs(x),self.Ys(x)
-        n=self.name()+"_n{:d}".format(npoints)+"_space"+spacing+".txt"
+        elif (spacing=='adaptive'):
+            x=self.adaptive_x()
+        Xs,Ys,Xp,Yp=self.surfaces(x)
+        # Pressure side from TE to LE
+        Xp,Yp=Xp[::-1],Yp[::-1]
         X=concatenate((Xp,Xs),axis=None)
         Y=concatenate((Yp,Ys),axis=None)
-        C=stack((X,Y),axis=-1)
-        m="# Using npoints = {:d}".format(npoints)
-        savetxt(n,C,fmt='%12.9f %12.9f ',header=self.name()+"\n"+m,comments='')
+        return stack((X,Y),axis=-1)
+    
+    def text4Xfoil(self,npoints=20,spacing='cos'):
+        """ Returns the text of the file written by write4Xfoil """
+        return __text4Xfoil__(self.name(),self.points4Xfoil(npoints,spacing))
+    
+    def write4Xfoil(self,npoints=20,spacing='cos'):
+        """ Writes the X,Y coordinates to the file name_n(npoints)_space(spacing).txt and returns the file name 
+            (with the spacing 'adaptive' the number of points per side of the file name is the one of adaptive_x) """
+        C=self.points4Xfoil(npoints,spacing)
+        n=self.name()+"_n{:d}".format(len(C)//2)+"_space"+spacing+".txt"
+        with open(n,'w') as f:
+            f.write(__text4Xfoil__(self.name(),C))
+        return n
+
+
+###
+# Bulk export of foils 
+#
+
+def __text4Xfoil__(name,C):
+    """ Text of the file of write4Xfoil for the foil name and its (2*npoints,2) coordinates C """
+    m="# Using npoints = {:d}".format(len(C)//2)
+    return name+"\n"+m+"\n"+("%12.9f %12.9f \n"*len(C))%tuple(C.ravel())
+
+def __name_order__(names):
+    """ Names sorted (the foils of the same name in the order of the archive) and their positions in the archive """
+    from numpy import array, argsort
+    names=array(names,dtype=str)
+    order=argsort(names,kind='stable')
+    return names[order], order
+
+def __find__(keys,name):
+    """ Position in the sorted names keys of the first foil named name (binary search) """
+    from numpy import searchsorted
+    k=int(searchsorted(keys,name))
+    if (k==len(keys) or keys[k]!=name):
+        raise KeyError(name)
+    return k
+
+def write4Xfoil_many(foils,npoints=20,spacing='cos',archive=None,buffering=1<<20):
+    """ Writes the X,Y coordinates of many foils (any iterable of foils, e.g. all the sections of a blade) 
+    Inputs :
+      foils              : iterable of foils, used once (a generator does not keep the foils in memory)
+      npoints, spacing   : see write4Xfoil
+      archive            : None    : one file per foil, the same files as write4Xfoil
+                           'a.npz' : one numpy archive with the arrays names (n) and coords_0, coords_1, ... (2*npoints,2)
+                                     (one array per foil : with the spacing 'adaptive' the numbers of points differ)
+                                     and the sorted names keys (n) with their positions order (n)
+                           'a.txt' : (any other name) one text file with the contents of the files of write4Xfoil 
+                                     one after the other and an index a.txt.idx.npy (name, position, byte offset, number 
+                                     of lines sorted by name, and at : the row of the index of every position)
+      buffering          : size of the write buffer (bytes)
+    Returns : 
+      the list of the names of the foils """
+    names=[]
+    if (archive is None):
+        for foil in foils:
+            foil.write4Xfoil(npoints,spacing)
+            names.append(foil.name())
+    elif (archive.endswith('.npz')):
+        from numpy import savez, array
+        coords={}
+        for foil in foils:
+            coords["coords_{:d}".format(len(names))]=foil.points4Xfoil(npoints,spacing)
+            names.append(foil.name())
+        keys,order=__name_order__(names)
+        savez(archive,names=array(names,dtype=str),keys=keys,order=order,npoints=npoints,spacing=spacing,**coords)
+    else:
+        from numpy import array, empty, arange, save
+        offsets=[]
+        nlines=[]
+        with open(archive,'wb',buffering=buffering) as f:
+            offset=0
+            for foil in foils:
+                txt=foil.text4Xfoil(npoints,spacing).encode()
+                f.write(txt)
+                offsets.append(offset)
+                nlines.append(txt.count(b"\n"))
+                offset+=len(txt)
+                names.append(foil.name())
+        keys,order=__name_order__(names)
+        idx=empty(len(names),dtype=[('name',keys.dtype if (len(keys)) else 'U1'),('pos','i8'),('offset','i8'),('nlines','i8'),('at','i8')])
+        idx['name']=keys
+        idx['pos']=order
+        idx['offset']=array(offsets,dtype='i8')[order]
+        idx['nlines']=array(nlines,dtype='i8')[order]
+        idx['at'][order]=arange(len(names))
+        save(archive+'.idx.npy',idx)
+    return names
+
+def read4Xfoil_many(archive,name):
+    """ Returns the (2*npoints,2) array of X,Y coordinates of a foil stored by write4Xfoil_many in archive 
+        name : the name of the foil (the first foil with this name is returned) or its position in the archive 
+        The foil is found by a binary search of the sorted names : the index of a text archive is memory-mapped (only the
+        pages of the search are read), the sorted names of a numpy archive are read at every call """
+    from numpy import load, loadtxt
+    if (archive.endswith('.npz')):
+        with load(archive) as A:
+            if isinstance(name,int):
+                i=name if (name>=0) else name+len(A['order'])
+            else:
+                i=int(A['order'][__find__(A['keys'],name)])
+            return A["coords_{:d}".format(i)]
+    idx=load(archive+'.idx.npy',mmap_mode='r')
+    k=int(idx['at'][name]) if isinstance(name,int) else __find__(idx['name'],name)
+    offset,nlines=int(idx['offset'][k]),int(idx['nlines'][k])
+    with open(archive,'rb') as f:
+        f.seek(offset)
+        lines=[f.readline() for i in range(nlines)]
+    return loadtxt(lines[2:],ndmin=2)
+
+#
+# END : Bulk export of foils
+###
+
+if (os.environ.get("FOIL_CACHE_DIR")):
+    enable_disk_cache()
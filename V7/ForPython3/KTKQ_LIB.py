@@ -0,0 +1,382 @@
+### PART OF FOIL LIBRARY
+# 
+# Author: Konstantinos POLITIS
+# 
+#   Open water characteristics of the Wageningen B-series propellers : 
+#   thrust and torque coefficients KT, KQ and open water efficiency eta0 
+#   given by the polynomials of Oosterveld and van Oossanen (1975) 
+#   
+#        KT = sum C (J)^s (P/D)^t (EAR)^u (Z)^v
+#        KQ = sum C (J)^s (P/D)^t (EAR)^u (Z)^v
+#        eta0 = KT J / (2 pi KQ)
+#   
+#   The coefficients are the ones of props_geo/WagKT.txt and props_geo/WagKQ.txt 
+#   (a table with the same format can be given to OpenWater).
+#   
+#   The polynomials are given for a Reynolds number Re=2e6 (at 0.75R). For higher Re 
+#   the corrections DKT, DKQ (see props_geo/REcor_Wagen.pdf) are added, they are 
+#   polynomials of J, P/D, EAR, Z and (log10(Re)-0.301) : 
+#        
+#        KT(Re) = KT + DKT(Re)
+#        KQ(Re) = KQ + DKQ(Re)
+#   
+#   All the functions accept arrays : J, P/D, EAR and Z are broadcasted against 
+#   each other. The polynomials are evaluated as polynomials of J whose coefficients 
+#   are evaluated on the broadcasted shape of P/D, EAR and Z only, so that for 
+#   grids (e.g. J[:,None], P_D[None,:]) the cost is mostly the one of a cubic in J.
+#   
+###
+from numpy import array as nparr
+
+class Jpolynomials:
+    """ Pair of polynomials (KT, KQ) of J whose coefficients are polynomials of the variables X (e.g. P/D, EAR, Z) """
+    
+    # Number of points of X treated at once  
+    __chunk=1<<14
+    
+    def __init__(self,KT,KQ,ns=None):
+        """ Tables KT, KQ : rows C, s (exponent of J), exponents of X. 
+            ns : number of coefficients of the polynomials of J (by default the highest exponent s+1) """
+        from numpy import unique, zeros, concatenate
+        self.ns=int(max(KT[:,1].max(),KQ[:,1].max()))+1 if (ns is None) else ns
+        # Monomials of X appearing in the tables
+        E=concatenate((KT[:,2:],KQ[:,2:])).astype(int)
+        self.mono,im=unique(E,axis=0,return_inverse=True)
+        im=im.ravel()
+        # Coefficients : row s of KT (s) and KQ (ns+s), column : monomial
+        self.C=zeros((2*self.ns,len(self.mono)))
+        for i in range(len(KT)):
+            self.C[int(KT[i,1]),im[i]]+=KT[i,0]
+        for i in range(len(KQ)):
+            self.C[self.ns+int(KQ[i,1]),im[len(KT)+i]]+=KQ[i,0]
+    
+    def coefs(self,X,rows=None):
+        """ Coefficients A of the polynomials of J (KT=sum_s A[s]J^s, KQ=sum_s A[ns+s]J^s) at X : 
+            array (2 ns,)+broadcasted shape of X (rows : only the given rows are computed) """
+        from numpy import broadcast_arrays, empty, ones
+        X=broadcast_arrays(*X)
+        shape=X[0].shape
+        X=[x.ravel() for x in X]
+        n=X[0].size
+        C=self.C if (rows is None) else self.C[rows]
+        A=empty((len(C),n))
+        for i in range(0,n,self.__chunk):
+            j=slice(i,i+self.__chunk)
+            M=ones((len(self.mono),len(X[0][j])))
+            for k in range(len(X)):
+                M*=self.powers(X[k][j],self.mono[:,k].max())[self.mono[:,k]]
+            A[:,j]=C@M
+        return A.reshape((len(C),)+shape)
+    
+    @staticmethod
+    def powers(x,n):
+        """ x^0, ..., x^n : array (n+1,len(x)) """
+        from numpy import empty
+        X=empty((n+1,len(x)))
+        X[0]=1
+        for k in range(1,n+1):
+            X[k]=X[k-1]*x
+        return X
+    
+    @staticmethod
+    def horner(A,J):
+        """ Horner evaluation of the polynomial of J with coefficients A[0], ..., A[-1] """
+        K=A[-1]
+        for a in A[-2::-1]:
+            K=K*J+a
+        return K
+    
+    @staticmethod
+    def derivative(A):
+        """ Coefficients of the derivative of the polynomial of J with coefficients A[0], ..., A[-1] """
+        from numpy import arange
+        return A[1:]*arange(1,len(A)).reshape((len(A)-1,)+(1,)*(A.ndim-1))
+    
+    @staticmethod
+    def root(A,lo,hi,tol=1e-12,maxiter=50):
+        """ Root J in [lo,hi] of the polynomial with coefficients A (positive at lo, negative at hi) :  
+            Newton iterations safeguarded by bisection, for all the polynomials of A at once 
+            (the polynomials are treated by chunks that are iterated until convergence) """
+        from numpy import where, isfinite, broadcast_shapes, broadcast_to, empty, abs as npabs
+        shape=broadcast_shapes(A.shape[1:],lo.shape if hasattr(lo,'shape') else (),hi.shape if hasattr(hi,'shape') else ())
+        A=A.reshape((len(A),)+(1,)*(len(shape)-A.ndim+1)+A.shape[1:])
+        A=broadcast_to(A,(len(A),)+shape).reshape(len(A),-1)
+        lo=broadcast_to(lo*1.,shape).ravel()
+        hi=broadcast_to(hi*1.,shape).ravel()
+        J=empty(A.shape[1])
+        for i in range(0,len(J),Jpolynomials.__chunk):
+            c=slice(i,i+Jpolynomials.__chunk)
+            a,l,h=A[:,c],lo[c],hi[c]
+            da=Jpolynomials.derivative(a)
+            j=(l+h)/2
+            for it in range(maxiter):
+                f=Jpolynomials.horner(a,j)
+                pos=(f>0)
+                l=where(pos,j,l)
+                h=where(pos,h,j)
+                with_newton=j-f/Jpolynomials.horner(da,j)
+                bad=~isfinite(with_newton)|(with_newton<l)|(with_newton>h)
+                jn=where(bad,(l+h)/2,with_newton)
+                if (npabs(jn-j).max(initial=0)<=tol):
+                    j=jn
+                    break
+                j=jn
+            J[c]=j
+        return J.reshape(shape)
+
+
+class OpenWater:
+    """ Wageningen B-series open water polynomials KT, KQ (functions of J, P/D, EAR, Z and optionally Re) """
+    
+    # Rows : C, s(J), t(P/D), u(EAR), v(Z)
+    __KT=nparr([
+                [+0.00880496  , 0, 0, 0, 0],
+                [-0.204554    , 1, 0, 0, 0],
+                [+0.166351    , 0, 1, 0, 0],
+                [+0.158114    , 0, 2, 0, 0],
+                [-0.147581    , 2, 0, 1, 0],
+                [-0.481497    , 1, 1, 1, 0],
+                [+0.415437    , 0, 2, 1, 0],
+                [+0.0144043   , 0, 0, 0, 1],
+                [-0.0530054   , 2, 0, 0, 1],
+                [+0.0143481   , 0, 1, 0, 1],
+                [+0.0606826   , 1, 1, 0, 1],
+                [-0.0125894   , 0, 0, 1, 1],
+                [+0.0109689   , 1, 0, 1, 1],
+                [-0.133698    , 0, 3, 0, 0],
+                [+0.00638407  , 0, 6, 0, 0],
+                [-0.00132718  , 2, 6, 0, 0],
+                [+0.168496    , 3, 0, 1, 0],
+                [-0.0507214   , 0, 0, 2, 0],
+                [+0.0854559   , 2, 0, 2, 0],
+                [-0.0504475   , 3, 0, 2, 0],
+                [+0.010465    , 1, 6, 2, 0],
+                [-0.00648272  , 2, 6, 2, 0],
+                [-0.00841728  , 0, 3, 0, 1],
+                [+0.0168424   , 1, 3, 0, 1],
+                [-0.00102296  , 3, 3, 0, 1],
+                [-0.0317791   , 0, 3, 1, 1],
+                [+0.018604    , 1, 0, 2, 1],
+                [-0.00410798  , 0, 2, 2, 1],
+                [-0.000606848 , 0, 0, 0, 2],
+                [-0.0049819   , 1, 0, 0, 2],
+                [+0.0025983   , 2, 0, 0, 2],
+                [-0.000560528 , 3, 0, 0, 2],
+                [-0.00163652  , 1, 2, 0, 2],
+                [-0.000328787 , 1, 6, 0, 2],
+                [+0.000116502 , 2, 6, 0, 2],
+                [+0.000690904 , 0, 0, 1, 2],
+                [+0.00421749  , 0, 3, 1, 2],
+                [+0.0000565229, 3, 6, 1, 2],
+                [-0.00146564  , 0, 3, 2, 2]])
+    
+    __KQ=nparr([
+                [+0.00379368  , 0, 0, 0, 0],
+                [+0.00886523  , 2, 0, 0, 0],
+                [-0.032241    , 1, 1, 0, 0],
+                [+0.00344778  , 0, 2, 0, 0],
+                [-0.0408811   , 0, 1, 1, 0],
+                [-0.108009    , 1, 1, 1, 0],
+                [-0.0885381   , 2, 1, 1, 0],
+                [+0.188561    , 0, 2, 1, 0],
+                [-0.00370871  , 1, 0, 0, 1],
+                [+0.00513696  , 0, 1, 0, 1],
+                [+0.0209449   , 1, 1, 0, 1],
+                [+0.00474319  , 2, 1, 0, 1],
+                [-0.00723408  , 2, 0, 1, 1],
+                [+0.00438388  , 1, 1, 1, 1],
+                [-0.0269403   , 0, 2, 1, 1],
+                [+0.0558082   , 3, 0, 1, 0],
+                [+0.0161886   , 0, 3, 1, 0],
+                [+0.00318086  , 1, 3, 1, 0],
+                [+0.015896    , 0, 0, 2, 0],
+                [+0.0471729   , 1, 0, 2, 0],
+                [+0.0196283   , 3, 0, 2, 0],
+                [-0.0502782   , 0, 1, 2, 0],
+                [-0.030055    , 3, 1, 2, 0],
+                [+0.0417122   , 2, 2, 2, 0],
+                [-0.0397722   , 0, 3, 2, 0],
+                [-0.00350024  , 0, 6, 2, 0],
+                [-0.0106854   , 3, 0, 0, 1],
+                [+0.00110903  , 3, 3, 0, 1],
+                [-0.000313912 , 0, 6, 0, 1],
+                [+0.0035985   , 3, 0, 1, 1],
+                [-0.00142121  , 0, 6, 1, 1],
+                [-0.00383637  , 1, 0, 2, 1],
+                [+0.0126803   , 0, 2, 2, 1],
+                [-0.00318278  , 2, 3, 2, 1],
+                [+0.00334268  , 0, 6, 2, 1],
+                [-0.00183491  , 1, 1, 0, 2],
+                [+0.000112451 , 3, 2, 0, 2],
+                [-0.0000297228, 3, 6, 0, 2],
+                [+0.000269551 , 1, 0, 1, 2],
+                [+0.00083265  , 2, 0, 1, 2],
+                [+0.00155334  , 0, 2, 1, 2],
+                [+0.000302683 , 0, 6, 1, 2],
+                [-0.0001843   , 0, 0, 2, 2],
+                [-0.000425399 , 0, 3, 2, 2],
+                [+0.0000869243, 3, 3, 2, 2],
+                [-0.0004659   , 0, 6, 2, 2],
+                [+0.0000554194, 1, 6, 2, 2]])
+    
+    # Reynolds number corrections 
+    # Rows : C, s(J), t(P/D), u(EAR), v(Z), w(log10(Re)-0.301)
+    __DKT=nparr([
+                [+0.000353485 , 0, 0, 0, 0, 0],
+                [-0.00333758  , 2, 0, 1, 0, 0],
+                [-0.00478125  , 1, 1, 1, 0, 0],
+                [+0.000257792 , 2, 0, 1, 0, 2],
+                [+0.0000643192, 2, 6, 0, 0, 1],
+                [-0.0000110636, 2, 6, 0, 0, 2],
+                [-0.0000276305, 2, 0, 1, 1, 2],
+                [+0.0000954   , 1, 1, 1, 1, 1],
+                [+0.0000032049, 1, 3, 1, 2, 1]])
+    
+    __DKQ=nparr([
+                [-0.000591412 , 0, 0, 0, 0, 0],
+                [+0.00696898  , 0, 1, 0, 0, 0],
+                [-0.0000666654, 0, 6, 0, 1, 0],
+                [+0.0160818   , 0, 0, 2, 0, 0],
+                [-0.000938091 , 0, 1, 0, 0, 1],
+                [-0.00059593  , 0, 2, 0, 0, 1],
+                [+0.0000782099, 0, 2, 0, 0, 2],
+                [+0.0000052199, 2, 0, 1, 1, 1],
+                [-0.00000088528,1, 1, 1, 1, 2],
+                [+0.0000230171, 0, 6, 0, 1, 1],
+                [-0.00000184341,0, 6, 0, 1, 2],
+                [-0.00400252  , 0, 0, 2, 0, 1],
+                [+0.000220915 , 0, 0, 2, 0, 2]])
+    
+    # Range of validity of the Reynolds number corrections
+    __Re_min=2e6
+    __Re_max=2e9
+    
+    def __init__(self,KT_table=None,KQ_table=None):
+        """ Polynomials of the tables KT_table, KQ_table (file names, same format as props_geo/WagKT.txt), 
+            by default the tables of Oosterveld and van Oossanen """
+        KT=self.__KT if (KT_table is None) else read_table(KT_table)
+        KQ=self.__KQ if (KQ_table is None) else read_table(KQ_table)
+        self.ns=int(max(KT[:,1].max(),KQ[:,1].max(),self.__DKT[:,1].max(),self.__DKQ[:,1].max()))+1
+        self.base=Jpolynomials(KT,KQ,self.ns)
+        self.Recor=Jpolynomials(self.__DKT,self.__DKQ,self.ns)
+    
+    def logRe(self,Re):
+        """ Variable of the Reynolds number corrections : log10(Re)-0.301 (Re is clipped to [2e6,2e9]) """
+        from numpy import log10, clip
+        return log10(clip(Re,self.__Re_min,self.__Re_max))-0.301
+    
+    def Jcoefs(self,P_D,EAR,Z,Re=None,rows=None):
+        """ Coefficients A of the polynomials of J (KT=sum_s A[s]J^s, KQ=sum_s A[ns+s]J^s) at P/D, EAR, Z (and Re) : 
+            array (2 ns,)+broadcasted shape of P/D, EAR, Z, Re (rows : only the given rows are computed) """
+        A=self.base.coefs((P_D,EAR,Z),rows)
+        if (Re is not None):
+            B=self.Recor.coefs((P_D,EAR,Z,self.logRe(Re)),rows)
+            A=A.reshape((len(A),)+(1,)*(B.ndim-A.ndim)+A.shape[1:])+B
+        return A
+    
+    def JKT0(self,P_D,EAR,Z,Re=None,Jmax=3.,dJ=0.05):
+        """ Advance ratio of zero thrust (first root of KT in [0,Jmax], nan if KT does not change sign) """
+        from numpy import where, nan, zeros, full
+        A=self.Jcoefs(P_D,EAR,Z,Re,slice(0,self.ns))
+        # Bracket of the first change of sign of KT on a coarse grid of J 
+        found=zeros(A.shape[1:],dtype=bool)
+        hi=full(A.shape[1:],Jmax)
+        for k in range(1,int(round(Jmax/dJ))+1):
+            neg=(~found)&(Jpolynomials.horner(A,k*dJ)<=0)
+            hi[neg]=k*dJ
+            found|=neg
+            if (found.all()):
+                break
+        J=Jpolynomials.root(A,where(hi>dJ,hi-dJ,0),hi)
+        return where(found,J,nan)
+    
+    def DKTDKQ(self,J,P_D,EAR,Z,Re):
+        """ Reynolds number corrections DKT, DKQ """
+        A=self.Recor.coefs((P_D,EAR,Z,self.logRe(Re)))
+        return Jpolynomials.horner(A[:self.ns],J), Jpolynomials.horner(A[self.ns:],J)
+    
+    def KT(self,J,P_D,EAR,Z,Re=None):
+        """ Thrust coefficient KT (corrected for Re if given) """
+        return Jpolynomials.horner(self.Jcoefs(P_D,EAR,Z,Re,slice(0,self.ns)),J)
+    
+    def KQ(self,J,P_D,EAR,Z,Re=None):
+        """ Torque coefficient KQ (corrected for Re if given) """
+        return Jpolynomials.horner(self.Jcoefs(P_D,EAR,Z,Re,slice(self.ns,2*self.ns)),J)
+    
+    def KTKQ(self,J,P_D,EAR,Z,Re=None):
+        """ Thrust and torque coefficients KT, KQ (evaluated together, corrected for Re if given) """
+        A=self.Jcoefs(P_D,EAR,Z,Re)
+        return Jpolynomials.horner(A[:self.ns],J), Jpolynomials.horner(A[self.ns:],J)
+    
+    def eta0(self,J,P_D,EAR,Z,Re=None):
+        """ Open water efficiency eta0 = KT J / (2 pi KQ) """
+        from numpy import pi
+        KT,KQ=self.KTKQ(J,P_D,EAR,Z,Re)
+        return KT*J/(2*pi*KQ)
+    
+    def KTKQeta0(self,J,P_D,EAR,Z,Re=None):
+        """ KT, KQ and eta0 """
+        from numpy import pi
+        KT,KQ=self.KTKQ(J,P_D,EAR,Z,Re)
+        return KT, KQ, KT*J/(2*pi*KQ)
+
+
+def read_table(filename):
+    """ Reads a table of coefficients/exponents (format of props_geo/WagKT.txt : N C s t u v) : array of rows C, s, t, u, v """
+    from numpy import loadtxt
+    return loadtxt(filename,skiprows=1,usecols=(1,2,3,4,5),ndmin=2)
+
+### Polynomials of the default tables (constructed once)
+__openwater__=None
+
+def default():
+    """ The OpenWater polynomials of the default tables """
+    global __openwater__
+    if (__openwater__ is None):
+        __openwater__=OpenWater()
+    return __openwater__
+
+def KT(J,P_D,EAR,Z,Re=None):
+    """ Thrust coefficient KT of the Wageningen B-series """
+    return default().KT(J,P_D,EAR,Z,Re)
+
+def KQ(J,P_D,EAR,Z,Re=None):
+    """ Torque coefficient KQ of the Wageningen B-series """
+    return default().KQ(J,P_D,EAR,Z,Re)
+
+def KTKQ(J,P_D,EAR,Z,Re=None):
+    """ Thrust and torque coefficients KT, KQ of the Wageningen B-series """
+    return default().KTKQ(J,P_D,EAR,Z,Re)
+
+def eta0(J,P_D,EAR,Z,Re=None):
+    """ Open water efficiency eta0 of the Wageningen B-series """
+    return default().eta0(J,P_D,EAR,Z,Re)
+
+def JKT0(P_D,EAR,Z,Re=None):
+    """ Advance ratio of zero thrust of the Wageningen B-series """
+    return default().JKT0(P_D,EAR,Z,Re)
+
+def DKTDKQ(J,P_D,EAR,Z,Re):
+    """ Reynolds number corrections DKT, DKQ of the Wageningen B-series """
+    return default().DKTDKQ(J,P_D,EAR,Z,Re)
+
+### Reynolds number at 0.75R
+# c/R at 0.75R for EAR/Z=1 (Z<=3 and Z>3) : the chord spline cR of BseriesFoil is proportional to EAR/Z
+__cR075__=None
+
+def c075_D(EAR,Z):
+    """ Chord over diameter at 0.75R of the B-series (from the cR spline of WAGENINGEN_LIB) """
+    global __cR075__
+    from numpy import where, errstate
+    if (__cR075__ is None):
+        from WAGENINGEN_LIB import WAGENINGEN
+        # Note : the 3 blade tables have a zero tip chord (warnings in the construction of the t/c tables)
+        with errstate(divide='ignore',invalid='ignore'):
+            __cR075__=[float(WAGENINGEN(Z,1,0.75).cR(0.75))*Z for Z in (3,4)]
+    return where(Z<=3,__cR075__[0],__cR075__[1])*EAR/Z/2
+
+def Reynolds(VA,n,D,EAR,Z,nu=1.1883e-6):
+    """ Reynolds number at 0.75R : Re = c(0.75R) sqrt(VA^2+(0.75 pi n D)^2)/nu 
+        VA : advance speed, n : revolutions per second, D : diameter, nu : kinematic viscosity (sea water at 15 C) """
+    from numpy import sqrt, pi
+    return c075_D(EAR,Z)*D*sqrt(VA**2+(0.75*pi*n*D)**2)/nu
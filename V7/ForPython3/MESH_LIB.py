@@ -0,0 +1,154 @@
+### PART OF FOIL LIBRARY
+#
+# Author: Konstantinos POLITIS
+#
+#   Triangulated surfaces of wings and blades (binary STL, OBJ) without FreeCAD
+#
+#   The surface is defined by sections given along the span : for each section the
+#   points of the back/suction side and of the face/pressure side at the same chordwise
+#   locations from the leading edge to the trailing edge (e.g. the Xs,Ys and Xp,Yp of
+#   afoil.surfaces placed in space, or the arrays of BseriesFoil.blade).
+#
+#   Consecutive sections are joined by triangles and the first and last sections are
+#   capped, so that the surface is closed. The sections are read from an iterable and
+#   the triangles are written by chunks of sections : the whole surface is never stored.
+#
+#   Example :
+#        back,face=WAGENINGEN_blade(4,0.7,1.0,rR,x)
+#        write_stl("blade.stl",zip(back,face))
+#
+###
+
+def section_ring(back,face,TE_closed):
+    """ Closed polygon of a section : face from the trailing edge to the leading edge, then back from the
+        leading edge to the trailing edge (the common points are not repeated). back, face : arrays (...,n_x,3) """
+    from numpy import concatenate
+    face=face[...,::-1,:]
+    if (TE_closed):
+        return concatenate((face,back[...,1:-1,:]),axis=-2)
+    return concatenate((face,back[...,1:,:]),axis=-2)
+
+def side_triangles(m):
+    """ Triangles (vertex indices, ring k : 0..m-1, ring k+1 : m..2m-1) joining two consecutive rings of m points """
+    from numpy import arange, stack, concatenate
+    j=arange(m)
+    jn=(j+1)%m
+    return concatenate((stack((j,jn,m+jn),axis=-1),stack((j,m+jn,m+j),axis=-1)))
+
+def cap_triangles(n,TE_closed):
+    """ Triangles (vertex indices of a ring) closing a section of n chordwise points : strips from the leading edge
+        to the trailing edge between the face and the back (the degenerate triangles at the edges are removed) """
+    from numpy import arange, stack, concatenate
+    i=arange(n-1)
+    f=n-1-i                       # face at x_i
+    b=n-1+i                       # back at x_i (b(0)=f(0) : leading edge)
+    fn,bn=f-1,b+1
+    if (TE_closed):
+        bn[-1]=0                  # back at the trailing edge = face at the trailing edge
+    T=concatenate((stack((f,fn,bn),axis=-1),stack((f,bn,b),axis=-1)))
+    return T[(T[:,0]!=T[:,1])&(T[:,1]!=T[:,2])&(T[:,0]!=T[:,2])]
+
+def __area_vectors__(P):
+    """ Area vectors (cross products / 2) of the triangles P (...,3 vertices,3) """
+    from numpy import cross
+    return 0.5*cross(P[...,1,:]-P[...,0,:],P[...,2,:]-P[...,0,:])
+
+class __Triangulation__:
+    """ Triangles of the surface, by chunks of sections (used by the writers) """
+
+    def __init__(self,sections,chunk,tol):
+        from numpy import asarray
+        self.it=iter(sections)
+        self.chunk=chunk
+        back,face=[asarray(v,dtype=float) for v in next(self.it)]
+        n=back.shape[0]
+        scale=max(abs(back).max(),1e-300)
+        self.TE_closed=bool(abs(back[-1]-face[-1]).max()<=tol*scale)
+        self.first=section_ring(back,face,self.TE_closed)
+        self.m=self.first.shape[0]
+        self.side=side_triangles(self.m)
+        self.cap=cap_triangles(n,self.TE_closed)
+        self.flip=None
+
+    def chunks(self):
+        """ Yields (k, R, I) : R (g+1,m,3) rings k to k+g (ring k is the last ring of the previous chunk),
+            I (t,3) triangles of the chunk (indices of the points of R.reshape(-1,3)) """
+        from numpy import asarray, stack, concatenate, arange
+        m=self.m
+        R=self.first[None]
+        k=0
+        while True:
+            rings=[R[-1]]
+            for back,face in self.it:
+                rings.append(section_ring(asarray(back,dtype=float),asarray(face,dtype=float),self.TE_closed))
+                if (len(rings)>self.chunk):
+                    break
+            if (len(rings)==1):
+                break
+            R=stack(rings)
+            I=(m*arange(len(R)-1)[:,None,None]+self.side).reshape(-1,3)
+            if (self.flip is None):
+                self.__orientation(R)
+                I=concatenate((self.cap[:,::-1] if self.flip[1] else self.cap,I[:,::-1] if self.flip[0] else I))
+            elif (self.flip[0]):
+                I=I[:,::-1]
+            yield k, R, I
+            k+=len(R)-1
+        if (self.flip is None):
+            raise ValueError("At least two sections are required")
+        # Cap of the last section : opposite to the cap of the first section
+        yield k-len(R)+1, R, m*(len(R)-1)+(self.cap if self.flip[1] else self.cap[:,::-1])
+
+    def __orientation(self,R):
+        """ Outward orientation of the triangles, tested on the first two sections :
+            flip[0] : reverse the side triangles, flip[1] : reverse the cap of the first section """
+        from numpy import concatenate
+        P=concatenate((R[0],R[1]))[self.side]
+        c=R[:2].reshape(-1,3).mean(axis=0)
+        sides=(__area_vectors__(P)*(P.mean(axis=1)-c)).sum()<0
+        cap=(__area_vectors__(R[0][self.cap]).sum(axis=0)*(R[0].mean(axis=0)-R[1].mean(axis=0))).sum()<0
+        self.flip=(bool(sides),bool(cap))
+
+def write_stl(filename,sections,name="foil",chunk=64,tol=1e-9):
+    """ Writes the closed surface of the sections to the binary STL file filename
+        sections : iterable of (back, face) pairs of arrays (n_x,3) ordered along the span (e.g. zip(back,face))
+        chunk    : number of sections triangulated and written at once
+        tol      : the trailing edge is closed if the back and face trailing edge points are closer than tol (relative)
+        Returns the number of triangles """
+    from numpy import zeros, cross, sqrt, where, dtype
+    from struct import pack
+    rec=dtype([('n','<f4',(3,)),('v','<f4',(3,3)),('a','<u2')])
+    ntri=0
+    with open(filename,'wb') as f:
+        f.write(pack('80s',("PEE_PythonFoils "+name).encode()[:80]))
+        f.write(pack('<I',0))
+        for k,R,I in __Triangulation__(sections,chunk,tol).chunks():
+            T=R.reshape(-1,3)[I]
+            N=cross(T[:,1]-T[:,0],T[:,2]-T[:,0])
+            L=sqrt((N**2).sum(axis=1,keepdims=True))
+            data=zeros(len(T),dtype=rec)
+            data['n']=N/where(L>0,L,1)
+            data['v']=T
+            data.tofile(f)
+            ntri+=len(T)
+        # Number of triangles
+        f.seek(80)
+        f.write(pack('<I',ntri))
+    return ntri
+
+def write_obj(filename,sections,name="foil",chunk=64,tol=1e-9):
+    """ Writes the closed surface of the sections to the OBJ file filename (points of the sections, triangular faces)
+        Inputs : see write_stl. Returns the number of triangles """
+    from numpy import savetxt
+    tri=__Triangulation__(sections,chunk,tol)
+    ntri=0
+    nrings=0
+    with open(filename,'w') as f:
+        f.write("# PEE_PythonFoils\no "+name+"\n")
+        for k,R,I in tri.chunks():
+            # Points of the rings not written yet (point j of ring k : index k m+j+1)
+            savetxt(f,R[nrings-k:].reshape(-1,3),fmt="v %.9g %.9g %.9g")
+            nrings=k+len(R)
+            savetxt(f,I+k*tri.m+1,fmt="f %d %d %d")
+            ntri+=len(I)
+    return ntri
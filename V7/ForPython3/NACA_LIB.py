@@ -8,7 +8,7 @@
 #   Defines a Specific Instance of Foil : NACA
 #   
 #  To do list : 
-#    - Add other NACA constructors (series 6)
+#    - Add other NACA constructors (series 6 : other thickness forms than 16 and 66(mod))
 # 
 ###
 #Features of 3.7 that do not work with Python 2.7 : 
@@ -16,12 +16,35 @@
 # 2. division // by default              : requires future
 #from __future__ import division
 from FOIL import afoil as foil
+from numpy import array as nparr
 import abc
 
 def NACA(code,params=[0,0,0.15],TE_closed=1):
-    """ NACA Picker """
-    if (len(code) == 5):
-        return None # not yet implemented
+    """ NACA Picker 
+    Codes :
+      4 digits  "MPTT"  or "xxxx"  with params=[m,p,t]        : Series4
+      5 digits  "LPQTT" or "xxxxx" with params=[cl,p,t,reflex] : Series5 (reflex is optional, default 0)
+      "thickness_meanline"         with params=[f,-,t]         : Series6 (f is the maximum camber, see Series6 
+                                                                 for the available thickness forms and mean lines) """
+    if ('_' in code):
+        thickness,meanline=code.split('_',1)
+        return Series6(thickness,meanline,params[0],params[2],TE_closed)
+    elif (len(code) == 5):
+        if (code=='XXXXX' or code=='xxxxx'):
+            cl=params[0]
+            p=params[1]
+            t=params[2]
+            reflex=params[3] if (len(params)>3) else 0
+        else:
+            # Find digits
+            L=int(code[0])
+            P=int(code[1])
+            reflex=int(code[2])
+            # Find actual values
+            cl=L*3/20
+            p=P/20
+            t=int(code[3:5])/100
+        return Series5(cl,p,t,reflex,TE_closed)
     elif (len(code) == 4):
         if (code=='XXXX' or code=='xxxx'):
             m=params[0]
@@ -95,6 +118,17 @@ class NACArep(foil):
         val=0*x
         return val 
     
+    def compute_surfaces(self,x):
+        """ Suction and pressure side coordinates (Xs,Ys,Xp,Yp) from one evaluation of yc, dyc and yt """
+        from numpy import sqrt
+        dyc=self.dyc(x)
+        yt=self.yt(x)
+        yc=self.yc(x)
+        nR=sqrt(1+dyc**2)
+        dx=dyc/nR*yt
+        dy=yt/nR
+        return x-dx, yc+dy, x+dx, yc-dy
+    
     def vecS_TE(self):
         """ Tangent at TE at pressure and suction (orientation from pressure to suction - towards LE and back to TE towards wake) """
         from numpy import sqrt
@@ -212,7 +246,7 @@ class Series4(NACArep):
             y+=self.__A4c*x**4
         else:
             y+=self.__A4o*x**4
-        y*=self.t/0.2
+        y=y*self.t/0.2
         return y
 
     # definition of thickness derivative 
@@ -223,7 +257,7 @@ class Series4(NACArep):
             dy+=self.__A4c*4*x**3
         else:
             dy+=self.__A4o*4*x**3
-        dy*=self.t/0.2
+        dy=dy*self.t/0.2
         return dy
     
     # definition of camber line curvature (ddyc/sqrt(1+dyc**2))
@@ -235,3 +269,319 @@ class Series4(NACArep):
         curv=-2*where(x<=self.p,self.m/self.p**2,self.m/(1-self.p)**2)/sqrt(1+self.dyc(x)**2)**3
         return curv
     
+
+
+class Series5(Series4):
+    """ NACA Series 5 (standard and reflex camber lines, Series 4 thickness) """
+    
+    ### Declaration of Constants
+    # Do not modify if not sure
+    
+    # Camber line constants for the design lift coefficient cl=0.3 
+    # Location of maximum camber p=P/20 for :  P = 1       2       3       4       5 
+    # Standard camber line
+    __r   =nparr([0.0580 , 0.1260 , 0.2025 , 0.2900 , 0.3910])
+    __k1  =nparr([361.4  , 51.64  , 15.957 , 6.643  , 3.230 ])
+    # Reflex camber line (not defined for P=1)
+    __rR  =nparr([0      , 0.1300 , 0.2170 , 0.3180 , 0.4410])
+    __k1R =nparr([0      , 51.99  , 15.793 , 6.520  , 3.191 ])
+    __k21R=nparr([0      , 0.000764,0.00677, 0.0303 , 0.1355])
+    
+###>End of Declaration of Constants
+    
+    ### Definition of methods  
+    
+    #Initialiser
+    def __init__(self,cl,p,t,reflex=0,TE_closed=True):
+        """ Initialiser : design lift coefficient, location of maximum camber, thickness, reflex camber line and closed trailing edge specifier """
+        self.cl=cl
+        self.p=p
+        self.t=t
+        self.reflex=reflex
+        self.closed(TE_closed=TE_closed)
+        # Camber line constants
+        P=int(round(p*20))
+        if (abs(P-p*20)>1e-6 or P<1 or P>5 or (reflex and P<2)):
+            raise ValueError("NACA 5 digits : p must be one of 0.05, 0.10, 0.15, 0.20, 0.25 (0.05 not available for reflex)")
+        if (reflex):
+            self.r  =self.__rR[P-1]
+            self.k1 =self.__k1R[P-1]*cl/0.3
+            self.k21=self.__k21R[P-1]
+            self.code="NACA5R_{:.3f}_{:.3f}_{:.3f}".format(self.cl,self.p,self.t)
+        else:
+            self.r  =self.__r[P-1]
+            self.k1 =self.__k1[P-1]*cl/0.3
+            self.k21=0
+            self.code="NACA5_{:.3f}_{:.3f}_{:.3f}".format(self.cl,self.p,self.t)
+    
+    # Visual Verifier of parameters
+    def show_parameters(self):
+        print("NACA 5 digits : ",self.code)
+        print("cl=",self.cl)
+        print("p=",self.p)
+        print("t=",self.t)
+        print("reflex=",self.reflex)
+        self.printclosed()
+    
+    # definition of camber line
+    def yc(self,x):
+        """ Compute y=Y/c values of the camber line """
+        from numpy import where
+        r,k1,k21=self.r,self.k1,self.k21
+        if (self.reflex):
+            y=k1/6*(where(x<r,1,k21)*(x-r)**3-k21*(1-r)**3*x-r**3*x+r**3)
+        else:
+            y=where(x<r,k1/6*(x**3-3*r*x**2+r**2*(3-r)*x),k1*r**3/6*(1-x))
+        return y
+    
+    # definition of camber line derivative
+    def dyc(self,x):
+        """ Compute dy/dx(=dY/dX) values of the camber line (0<x<1) """
+        from numpy import where
+        r,k1,k21=self.r,self.k1,self.k21
+        if (self.reflex):
+            dy=k1/6*(3*where(x<r,1,k21)*(x-r)**2-k21*(1-r)**3-r**3)
+        else:
+            dy=where(x<r,k1/6*(3*x**2-6*r*x+r**2*(3-r)),-k1*r**3/6+0*x)
+        return dy
+    
+    # definition of camber line curvature (ddyc/sqrt(1+dyc**2))
+    def curv(self,x):
+        """ Compute d2y/dx2 values of the camber line (0<x<1) """
+        from numpy import where, sqrt
+        ddy=self.k1*(x-self.r)*where(x<self.r,1,self.k21)
+        return ddy/sqrt(1+self.dyc(x)**2)**3
+
+
+class Series6(NACArep):
+    """ NACA Series 6 and 16 : tabulated thickness forms with a tabulated mean line 
+    Thickness forms : 
+        '66mod' : NACA 66 (modified)
+        '16'    : NACA 16
+    Mean lines : 
+        '64', '65', '66'         : NACA 64/65/66 mean lines
+        'a0.8', 'a0.8mod', 'a1'  : NACA a=0.8, a=0.8 (modified) and a=1 mean lines
+    The thickness t and the maximum camber f are given as ratios to the chord. Both thickness forms 
+    have an open trailing edge : for TE_closed the thickness is closed by a linear correction. """
+    
+    ### Declaration of Constants
+    # Do not modify if not sure
+    
+    # Thickness forms : x/c and yt/tmax 
+    __thickness={
+    '66mod' : nparr([
+    [0     , 0.005 , 0.0075, 0.0125, 0.0250, 0.0500, 0.0750, 0.1000, 0.1500, 0.2000, 0.2500, 0.3000, 0.3500, 
+     0.4000, 0.4500, 0.5000, 0.5500, 0.6000, 0.6500, 0.7000, 0.7500, 0.8000, 0.8500, 0.9000, 0.9500, 1.0000],
+    [0     , 0.0665, 0.0812, 0.1044, 0.1466, 0.2066, 0.2525, 0.2907, 0.3521, 0.4000, 0.4363, 0.4637, 0.4832, 
+     0.4952, 0.5000, 0.4962, 0.4846, 0.4653, 0.4383, 0.4035, 0.3612, 0.3110, 0.2532, 0.1877, 0.1143, 0.0333]]),
+    '16'    : nparr([
+    [0     , 0.0125, 0.0250, 0.0500, 0.0750, 0.1000, 0.1500, 0.2000, 0.3000, 0.4000, 0.5000, 0.6000, 0.7000, 
+     0.8000, 0.9000, 0.9500, 1.0000],
+    [0     , 0.1077, 0.1504, 0.2091, 0.2527, 0.2881, 0.3445, 0.3887, 0.4514, 0.4879, 0.5000, 0.4862, 0.4391, 
+     0.3499, 0.2098, 0.1179, 0.0100]])}
+    
+    # Mean lines : x/c (%), yc/c (%) and dyc/dx (nan if not provided) 
+    # Note : 64/65/66 are given for a maximum camber of 6%, the a mean lines for a design lift coefficient of 1
+    __x_66=nparr([0, 1.25, 2.5, 5.0, 7.5, 10, 15, 20, 25, 30, 40, 50, 60, 70, 80, 90, 95, 100])
+    __x_a =nparr([0, 0.5, 0.75, 1.25, 2.5, 5.0, 7.5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90, 95, 100])
+    __nan=float('nan')
+    __meanline={
+    '64'      : (__x_66,
+                 nparr([0      , 0.369  , 0.726  , 1.406  , 2.039  , 2.625  , 3.656  , 4.500  , 5.156  , 5.625  , 6.000  , 5.833  , 
+                        5.333  , 4.500  , 3.333  , 1.833  , 0.958  , 0      ]),
+                 nparr([0.30000, 0.29062, 0.28125, 0.26250, 0.24375, 0.22500, 0.18750, 0.15000, 0.11250, 0.07500, 0      ,-0.03333, 
+                       -0.06667,-0.10000,-0.13333,-0.16667,-0.18333,-0.20000])),
+    '65'      : (__x_66,
+                 nparr([0      , 0.296  , 0.585  , 1.140  , 1.665  , 2.160  , 3.060  , 3.840  , 4.500  , 5.040  , 5.760  , 6.000  , 
+                        5.760  , 5.040  , 3.840  , 2.160  , 1.140  , 0      ]),
+                 nparr([0.24000, 0.23400, 0.22800, 0.21600, 0.20400, 0.19200, 0.16800, 0.14400, 0.12000, 0.09600, 0.04800, 0      , 
+                       -0.04800,-0.09600,-0.14400,-0.19200,-0.21600,-0.24000])),
+    '66'      : (__x_66,
+                 nparr([0      , 0.247  , 0.490  , 0.958  , 1.406  , 1.833  , 2.625  , 3.333  , 3.958  , 4.500  , 5.333  , 5.833  , 
+                        6.000  , 5.625  , 4.500  , 2.625  , 1.406  , 0      ]),
+                 nparr([0.20000, 0.19583, 0.19167, 0.18333, 0.17500, 0.16667, 0.15000, 0.13333, 0.11667, 0.10000, 0.06667, 0.03333, 
+                        0      ,-0.07500,-0.15000,-0.22500,-0.26250,-0.30000])),
+    'a0.8'    : (__x_a,
+                 nparr([0      , 0.287  , 0.404  , 0.616  , 1.077  , 1.841  , 2.483  , 3.043  , 3.985  , 4.748  , 5.367  , 5.863  , 6.248  , 
+                        6.528  , 6.709  , 6.790  , 6.770  , 6.644  , 6.405  , 6.037  , 5.514  , 4.771  , 3.683  , 2.435  , 1.163  , 0      ]),
+                 nparr([__nan  , 0.48535, 0.44925, 0.40359, 0.34104, 0.27718, 0.23868, 0.21050, 0.16892, 0.13734, 0.11101, 0.08775, 0.06634, 
+                        0.04601, 0.02613, 0.00620,-0.01433,-0.03611,-0.06010,-0.08790,-0.12311,-0.18412,-0.23921,-0.25583,-0.24904,-0.20385])),
+    'a0.8mod' : (__x_a,
+                 nparr([0      , 0.281  , 0.396  , 0.603  , 1.055  , 1.803  , 2.432  , 2.981  , 3.903  , 4.651  , 5.257  , 5.742  , 6.120  , 
+                        6.394  , 6.571  , 6.651  , 6.631  , 6.508  , 6.274  , 5.913  , 5.401  , 4.673  , 3.607  , 2.452  , 1.226  , 0      ]),
+                 nparr([__nan  , 0.47539, 0.44004, 0.39531, 0.33404, 0.27149, 0.23378, 0.20618, 0.16546, 0.13452, 0.10873, 0.08595, 0.06498, 
+                        0.04507, 0.02559, 0.00607,-0.01404,-0.03537,-0.05887,-0.08610,-0.12058,-0.18034,-0.23430,-0.24521,-0.24521,-0.24521])),
+    'a1'      : (__x_a,
+                 nparr([0      , 0.250  , 0.350  , 0.535  , 0.930  , 1.580  , 2.120  , 2.585  , 3.365  , 3.980  , 4.475  , 4.860  , 5.150  , 
+                        5.355  , 5.475  , 5.515  , 5.475  , 5.355  , 5.150  , 4.860  , 4.475  , 3.980  , 3.365  , 2.585  , 1.580  , 0      ]),
+                 nparr([__nan  , 0.42120, 0.38875, 0.34770, 0.29155, 0.23430, 0.19995, 0.17485, 0.13805, 0.11030, 0.08745, 0.06745, 0.04925, 
+                        0.03225, 0.01595, 0      ,-0.01595,-0.03225,-0.04925,-0.06745,-0.08745,-0.11030,-0.13805,-0.17485,-0.23430, __nan  ]))}
+    
+    # Interpolants of the tables (constructed once, when first used)
+    __interpolants={}
+    
+    # The interpolants of an instance come from the tables (not parameters of the foil, see CACHE_LIB.parameters)
+    cache_ignore=NACArep.cache_ignore+('ytSp','ycSp','ddycSp')
+    
+###>End of Declaration of Constants
+    
+    ### Definition of methods  
+    
+    #Initialiser
+    def __init__(self,thickness='66mod',meanline='a0.8',f=0,t=0.1,TE_closed=False):
+        """ Initialiser : thickness form, mean line, maximum camber, thickness and closed trailing edge specifier """
+        if (thickness not in self.__thickness):
+            raise ValueError("NACA 6 : unknown thickness form "+thickness+", available : "+", ".join(self.__thickness))
+        if (meanline not in self.__meanline):
+            raise ValueError("NACA 6 : unknown mean line "+meanline+", available : "+", ".join(self.__meanline))
+        self.thickness=thickness
+        self.meanline=meanline
+        self.f=f
+        self.t=t
+        self.closed(TE_closed=TE_closed)
+        self.code="NACA{:s}_{:s}_{:.3f}_{:.3f}".format(thickness,meanline,self.f,self.t)
+        # Interpolants of yt/tmax (function of sqrt(x)) and of the mean line scaled to a unit maximum camber
+        self.ytSp=self.interpolant('t'+thickness)
+        self.ycSp=self.interpolant('c'+meanline)
+        self.ddycSp=self.interpolant('d'+meanline)
+        # Thickness at the trailing edge (removed linearly if the foil is closed)
+        self.__ytTE=self.ytSp(1.) if TE_closed else 0.
+    
+    @classmethod
+    def interpolant(cls,key):
+        """ Returns the interpolant of a table : t+thickness form, c+mean line, d+mean line (second derivative) """
+        if (key in cls.__interpolants):
+            return cls.__interpolants[key]
+        from scipy import interpolate
+        from numpy import sqrt, isnan
+        if (key[0]=='t'):
+            x,yt=cls.__thickness[key[1:]]
+            # The thickness behaves as sqrt(x) near the leading edge : interpolate at u=sqrt(x)
+            cls.__interpolants[key]=interpolate.CubicSpline(sqrt(x),yt)
+        elif (key[0]=='c'):
+            x,yc,dyc=cls.__meanline[key[1:]]
+            x=x/100
+            yc=yc/100
+            dyc=dyc.copy()
+            # Slopes not given at the ends : one sided second order differences
+            if (isnan(dyc[0])):
+                dyc[0]=cls.__slope3(x[:3],yc[:3])
+            if (isnan(dyc[-1])):
+                dyc[-1]=cls.__slope3(x[-1:-4:-1],yc[-1:-4:-1])
+            # Hermite interpolation with the tabulated slopes, scaled to a unit maximum camber
+            cls.__interpolants[key]=interpolate.CubicHermiteSpline(x,yc/yc.max(),dyc/yc.max())
+        else:
+            cls.__interpolants[key]=cls.interpolant('c'+key[1:]).derivative(2)
+        return cls.__interpolants[key]
+    
+    @staticmethod
+    def __slope3(x,y):
+        """ Slope at x[0] of the parabola through three points """
+        h1=x[1]-x[0]
+        h2=x[2]-x[0]
+        return ((y[1]-y[0])*h2**2-(y[2]-y[0])*h1**2)/(h1*h2*(h2-h1))
+    
+    # Visual Verifier of parameters
+    def show_parameters(self):
+        print("NACA 6 : ",self.code)
+        print("thickness form=",self.thickness)
+        print("mean line=",self.meanline)
+        print("f=",self.f)
+        print("t=",self.t)
+        self.printclosed()
+    
+    # Name
+    def name(self):
+        """ Get the foils name """
+        return self.code
+    
+    # definition of camber line
+    def yc(self,x):
+        """ Compute y=Y/c values of the camber line """
+        return self.f*self.ycSp(x)
+    
+    # definition of camber line derivative
+    def dyc(self,x):
+        """ Compute dy/dx(=dY/dX) values of the camber line (0<x<1) """
+        return self.f*self.ycSp(x,1)
+    
+    # definition of camber line curvature (ddyc/sqrt(1+dyc**2))
+    def curv(self,x):
+        """ Compute d2y/dx2 values of the camber line (0<x<1) """
+        from numpy import sqrt
+        return self.f*self.ddycSp(x)/sqrt(1+self.dyc(x)**2)**3
+    
+    # definition of thickness 
+    def yt(self,x):
+        from numpy import sqrt
+        return self.t*(self.ytSp(sqrt(x))-self.__ytTE*x)
+    
+    # definition of thickness derivative 
+    def dyt(self,x):
+        from numpy import sqrt
+        u=sqrt(x)
+        return self.t*(self.ytSp(u,1)/(2*u)-self.__ytTE)
+
+
+class Series4Family(Series4):
+    """ NACA Series 4 family : m, p, t are arrays (broadcastable against x) """
+    
+    ### Definition of methods  
+    
+    #Initialiser
+    def __init__(self,m,p,t,TE_closed=True):
+        """ Initialiser : Parameters (arrays), and closed trailing edge specifier 
+            The values returned for x are broadcasted against m, p, t : for exemple to obtain
+            arrays (n_foils,n_x) for n_foils parameter values use m[:,None], p[:,None], t[:,None] """
+        from numpy import asarray, broadcast
+        self.m=asarray(m,dtype=float)
+        self.p=asarray(p,dtype=float)
+        self.t=asarray(t,dtype=float)
+        self.closed(TE_closed=TE_closed)
+        self.code="NACA4_family_n{:d}".format(broadcast(self.m,self.p,self.t).size)
+    
+    # Visual Verifier of parameters
+    def show_parameters(self):
+        print("NACA 4 digits family : ",self.code)
+        print("m=",self.m)
+        print("p=",self.p)
+        print("t=",self.t)
+        self.printclosed()
+    
+    # Camber line coefficients m/p**2 (x<=p) or m/(1-p)**2 (x>p), zero for p=0 
+    def camber_coefs(self,x):
+        """ Coefficients of the camber line parabolas at x """
+        from numpy import where, errstate
+        with errstate(divide='ignore',invalid='ignore'):
+            k=where(x<=self.p,self.m/self.p**2,self.m/(1-self.p)**2)
+        return where(self.p==0,0.,k)
+    
+    # definition of camber line
+    def yc(self,x):
+        """ Compute y=Y/c values of the camber line """
+        from numpy import where
+        return self.camber_coefs(x)*(-x**2+2*self.p*x+where(x<=self.p,0,1-2*self.p))
+    
+    # definition of camber line derivative
+    def dyc(self,x):
+        """ Compute dy/dx(=dY/dX) values of the camber line (0<x<1) """
+        return (-2*x+2*self.p)*self.camber_coefs(x)
+    
+    # definition of camber line curvature (ddyc/sqrt(1+dyc**2))
+    def curv(self,x):
+        """ Compute d2y/dx2 values of the camber line (0<x<1) """
+        from numpy import sqrt
+        k=self.camber_coefs(x)
+        return -2*k/sqrt(1+((-2*x+2*self.p)*k)**2)**3
+    
+    def compute_surfaces(self,x):
+        """ Suction and pressure side coordinates (Xs,Ys,Xp,Yp) of all the foils of the family at x """
+        from numpy import where, sqrt
+        k=self.camber_coefs(x)
+        yc=k*(-x**2+2*self.p*x+where(x<=self.p,0,1-2*self.p))
+        dyc=(-2*x+2*self.p)*k
+        nR=sqrt(1+dyc**2)
+        yt=self.yt(x)
+        dx=dyc/nR*yt
+        dy=yt/nR
+        return x-dx, yc+dy, x+dx, yc-dy
@@ -0,0 +1,350 @@
+### NumPy Foil Library : NPFoil
+#
+# Author: Konstantinos POLITIS
+#
+#   Headless version of FCFoil : the same Doc interface, but the sections are
+#   constructed with NumPy/SciPy only (no FreeCAD, no GUI).
+#
+#   The sections are stored as wires made of B-spline curves (scipy BSpline with
+#   3D coefficients). FreeCAD is only required to materialize the sections to a
+#   FreeCAD document (see Doc.materialize).
+#
+#  To do list :
+#    - Cylinders for propeller blades (as for FCFoil only planes are used)
+#
+###
+from numpy import array as nparr
+from DISTR_LIB import distribution, constant, linear, line, function, spline, table, NACA_const, WAGBS, FILE_const, sample_sections
+from TIMER_LIB import StageTimer, notimer
+
+# Basic Definitions
+O =nparr([0.,0.,0.])
+ux=nparr([1.,0.,0.])
+uy=nparr([0.,1.,0.])
+uz=nparr([0.,0.,1.])
+
+
+
+### Internal defaults for foil generating functions
+# Wageningen :
+__tLE_tmax__=0
+__tTE_tmax__=0
+__Smooth_LE__=False
+__x0s__=0.1
+__ks__ =0.5
+__x0p__=0.1
+__kp__ =0.5
+
+# NACA :
+__N4cod_def__="xxxx"
+__NACA4_def__=[0,0,0.15]
+__TE_closed__=True
+
+# Foils read from file : tolerance of the closed trailing edge (fraction of chord)
+__TE_tol__=1e-6
+
+# The chord is zero if smaller than this value
+__c_is_zero__=1e-3
+
+
+# Internal Options
+__LE2TEp__=False
+__LE2TEs__=False
+
+__spacing_lin__="linear"
+__spacing_cos__="cos"
+__spacing__=__spacing_lin__
+
+__spacing_z__=__spacing_lin__
+
+### End of Internal defaults for foil generating functions
+
+class Doc:
+    """ This is a Document that contains Foil Sections (same interface as FCFoil.Doc, without FreeCAD)."""
+
+    def __init__(self,document_name="Foil",L=1,n_sections=1,b=0.5,c=1,t=0,p=O,u=ux,n=uy):
+        """ Create a Named Document (by default the name is Foil)
+            Optinal Inputs : see FCFoil.Doc
+                b             : base point of the sections as a fraction of the chord (0.5)
+                c             : chord (1)
+                t             : twist angle in degrees, positive rotates the chord axis u towards -n (0)
+                p             : base point of the first section (O), the sections are placed along -uz at a distance L
+                u             : unit vector of the chord axis (ux)
+                n             : unit vector normal to the chord axis (uy)
+            The constructed sections are stored in the list sections (see Wire)."""
+        self.name=document_name
+        # Initialisations
+        self.ns=n_sections
+        self.b=constant(b)
+        self.c=constant(c)
+        self.t=constant(t)
+        self.p=line(p,-uz,L)
+        self.u=constant(u)
+        self.n=constant(n)
+        self.sections=[]
+        self.timer=notimer
+
+
+    # Initializer for .section
+    # User functions to a add certain foil for the whole span
+    def NACA(self,code=__N4cod_def__,params=__NACA4_def__,TE_closed=__TE_closed__):
+        """ Define the foil section as a NACA section """
+        self.s=NACA_const(code,params,TE_closed)
+
+
+    def WAGEN(self,Z,EAR,tLE_tmax=__tLE_tmax__,tTE_tmax=__tTE_tmax__,Smooth_LE=__Smooth_LE__,x0s=__x0s__,x0p=__x0p__,ks=__ks__,kp=__kp__):
+        """ Define the foil section as a Wageningen section """
+        self.s=WAGBS(Z,EAR,tLE_tmax,tTE_tmax,Smooth_LE,x0s,x0p,ks,kp)
+
+    def FILE(self,filename,database=None,TE_tol=__TE_tol__):
+        """ Define the foil section as a foil read from a Selig or Lednicer file (or by its name from a foil database, see FILEFOIL_LIB) """
+        self.s=FILE_const(filename,database,TE_tol)
+
+    def n_sections(self,n_sections):
+        self.ns=n_sections
+
+    def profile(self,enable=True,sections=False):
+        """ Times (enable=True) or not the stages of add (see TIMER_LIB), sections=True keeps the times of every section.
+            The timings of the following calls of add are returned by timings """
+        self.timer=StageTimer(sections) if enable else notimer
+
+    def timings(self,filename=None):
+        """ Returns the timings of add as a dict (None if not profiled), written as JSON to filename if given """
+        if (self.timer is notimer):
+            return None
+        if (filename is not None):
+            self.timer.to_json(filename)
+        return self.timer.report()
+
+
+    def add(self,nps=40,npp=40,Tvs=0,Tvp=0,zs=0,ze=1,spacing=__spacing_z__,here=False,processes=1):
+        """ Creates the Foil Sections as Wires (appended to the list sections and returned)
+        Input : see FCFoil.Doc.add
+            here     : logical : not used (kept for compatibility with FCFoil) 
+            processes: integer : number of processes used to construct the foils and sample their points/tangents 
+                                 (1 : serial, the default, None : all the cpus) """
+        from numpy import linspace, cos, pi
+        timer=self.timer
+        timer.start('add')
+        # Construct array of z values
+        t=linspace(zs,ze,self.ns)
+        if (spacing=='linear'):
+            self.zL=t
+        elif (spacing=='cos'):
+            self.zL=1-cos(pi*t/2)
+
+        # Spanwise quantities at all the sections
+        with timer.stage('distributions'):
+            C=self.c.at_all(self.zL)
+            P=self.p.at_all(self.zL)
+            U=self.u.at_all(self.zL)
+            N=self.n.at_all(self.zL)
+            B=self.b.at_all(self.zL)
+            T=self.t.at_all(self.zL)
+
+        # Sample the foils in a pool of processes
+        if (processes!=1):
+            with timer.stage('pool'):
+                zLs=self.zL[C>__c_is_zero__]
+                samples=dict(zip(zLs,sample_sections(self.s,zLs,__sampling__(nps,npp),processes)))
+
+        added=[]
+        for i,zL in enumerate(self.zL):
+
+            if ( C[i] <= __c_is_zero__ ):
+                # Case of zero chord => add a vertex
+                added.append(Wire("zL={:.3f}:".format(zL)+"Vertex:c=0",zL,[],vertex=P[i]))
+                continue
+
+            ### Get foil section at zL
+            timer.begin_section(zL)
+            with timer.stage('foil'):
+                afoil=self.s.at(zL) if (processes==1) else samples[zL]
+                name=afoil.name()
+
+            # Curves of the section (unit chord) in the plane of the section
+            if (npp==0) : # construction using one bspline will be used for the foil
+                sp=__make_spline__(afoil,nps=nps,npp=nps,Tv=Tvs,timer=timer)
+                if (not afoil.TE_closed):
+                    curves=[sp,__make_line__(sp(1),sp(0))]
+                else:
+                    curves=[sp]
+            else: # classic two bspline construction will be used for the foil
+                spP,spS=__make_splines__(afoil,nps=nps,npp=npp,Tvp=Tvp,Tvs=Tvs,timer=timer)
+                # Note : The following works only for the default orientation
+                # i.e. TE2LE
+                if ( (not afoil.LE_closed) and (not afoil.TE_closed) ):
+                    curves=[spP,__make_line__(spP(1),spS(1)),spS,__make_line__(spS(0),spP(0))]
+                elif ( (not afoil.LE_closed) and (afoil.TE_closed) ):
+                    curves=[spP,__make_line__(spP(1),spS(1)),spS]
+                elif ( (afoil.LE_closed) and (not afoil.TE_closed) ):
+                    curves=[spP,spS,__make_line__(spS(0),spP(0))]
+                else:
+                    curves=[spP,spS]
+
+            # Place the curves : chord, base point, twist and plane of the section
+            with timer.stage('transform'):
+                M,P0=section_transform(C[i],B[i],T[i],P[i],U[i],N[i])
+                added.append(Wire("zL={:.3f}:".format(zL)+name,zL,[__transform__(sp,M,P0) for sp in curves]))
+            timer.end_section(name)
+
+        self.sections.extend(added)
+        timer.stop()
+        return added
+
+    def materialize(self,document_name=None):
+        """ Creates a FreeCAD document (named as this document by default) containing the sections """
+        import FreeCAD
+        Docu=FreeCAD.newDocument(self.name if document_name is None else document_name)
+        for w in self.sections:
+            Docu.addObject("Part::Feature",w.name).Shape=w.toShape()
+        return Docu
+
+
+class Wire:
+    """ A section : list of 3D B-spline curves (or a vertex for sections of zero chord) """
+
+    def __init__(self,name,zL,curves,vertex=None):
+        self.name=name
+        self.zL=zL
+        self.curves=curves
+        self.vertex=vertex
+
+    def isvertex(self):
+        """ Checks if the section is a vertex """
+        return (self.vertex is not None)
+
+    def points(self,npoints=50):
+        """ Returns an (m,3) array of points of the wire (npoints per curve, vertices shared by consecutive curves are not repeated) """
+        from numpy import linspace, concatenate
+        if (self.isvertex()):
+            return self.vertex.reshape(1,3)
+        s=linspace(0,1,npoints)
+        P=[sp(s) for sp in self.curves]
+        return concatenate([P[0]]+[Pi[1:] for Pi in P[1:]])
+
+    def toShape(self):
+        """ Returns the FreeCAD shape (Part.Wire or Part.Vertex) of the section """
+        import Part
+        from FreeCAD import Base
+        if (self.isvertex()):
+            return Part.Vertex(Base.Vector(*self.vertex))
+        edges=[]
+        for sp in self.curves:
+            knots,mults=__knots_mults__(sp.t)
+            bs=Part.BSplineCurve()
+            bs.buildFromPolesMultsKnots([Base.Vector(*c) for c in sp.c],mults,knots,False,sp.k)
+            edges.append(bs.toShape())
+        return Part.Wire(edges)
+
+
+def section_transform(c,b,t,p,u,n):
+    """ Returns the matrix M (2,3) and the point P0 such that the point (x,y) of a unit chord foil is placed at P0+(x,y)@M
+        c : chord, b : base point (fraction of the chord), t : twist (degrees), p : base point, u : chord axis, n : normal to chord """
+    from numpy import asarray, cos, sin, pi, stack
+    p=asarray(p,dtype=float)
+    u=asarray(u,dtype=float)
+    n=asarray(n,dtype=float)
+    tr=t*pi/180
+    ut=u*cos(tr)-n*sin(tr)
+    nt=n*cos(tr)+u*sin(tr)
+    return c*stack((ut,nt)), p-c*b*ut
+
+###
+# Functions for constructing the splines without FreeCAD
+#
+
+def __sampling__(nps,npp):
+    """ Sides of a foil sampled by __make_spline__ (npp=0) or __make_splines__ (see DISTR_LIB.sampled_foil) """
+    if (npp==0):
+        return [('p',nps,False,__spacing__),('s',nps,True,__spacing__)]
+    return [('p',npp,__LE2TEp__,__spacing__),('s',nps,__LE2TEs__,__spacing__)]
+
+def __interpolate__(x,y,T0=None,T1=None):
+    """ Cubic spline interpolating the points x,y (chord length parameters in [0,1]) with optional tangents at the ends """
+    from numpy import stack, sqrt, diff, cumsum, concatenate, asarray
+    from scipy.interpolate import make_interp_spline
+    P=stack((x,y),axis=-1)
+    d=sqrt((diff(P,axis=0)**2).sum(axis=1))
+    s=concatenate(([0],cumsum(d)))
+    Ltot=s[-1]
+    s/=Ltot
+    if (T0 is None):
+        return make_interp_spline(s,P,k=3)
+    # The tangents are unit vectors : dP/ds is scaled by the length of the polygon
+    return make_interp_spline(s,P,k=3,bc_type=([(1,Ltot*asarray(T0,dtype=float))],[(1,Ltot*asarray(T1,dtype=float))]))
+
+def __make_line__(P0,P1):
+    """ Straight line from P0 to P1 (as a degree 1 B-spline) """
+    from scipy.interpolate import BSpline
+    from numpy import stack
+    return BSpline(nparr([0.,0.,1.,1.]),stack((P0,P1)),1)
+
+def __transform__(sp,M,P0):
+    """ Places a 2D B-spline curve in space : the control points (x,y) are mapped to P0+(x,y)@M """
+    from scipy.interpolate import BSpline
+    return BSpline(sp.t,P0+sp.c@M,sp.k)
+
+def __knots_mults__(t):
+    """ Distinct knots and multiplicities of a knot vector """
+    from numpy import unique
+    knots,mults=unique(t,return_counts=True)
+    return list(knots),[int(m) for m in mults]
+
+def __make_spline__(afoil,nps=40,npp=40,Tv=1,timer=notimer):
+    """ Return the spline of the Pressure-Suction side of a foil (see FCFoil.__make_spline__) """
+    from numpy import concatenate
+    timer.start('sample')
+    xpres,ypres,zpres,t=afoil.PressureSide_FCAD(npoints=npp,spacing=__spacing__)
+    xsuc,ysuc,zsuc,t=afoil.SuctionSide_FCAD(npoints=nps,spacing=__spacing__)
+
+    # NOTE : Total number of point nps+npp-1
+    x=concatenate((xpres[:-1],xsuc))
+    y=concatenate((ypres[:-1],ysuc))
+    timer.stop()
+
+    with timer.stage('interpolate'):
+        if (Tv):
+            # Get tangent vector at trailing edge
+            vecTE=afoil.vecS()[1]
+            return __interpolate__(x,y,vecTE[0:2],vecTE[2:4])
+
+        return __interpolate__(x,y)
+
+def __make_splines__(afoil,nps=40,npp=40,Tvp=1,Tvs=1,timer=notimer):
+    """ Returns the splines of the Pressure and Suction side of a foil (see FCFoil.__make_splines__) """
+    timer.start('sample')
+    xpres,ypres,zpres,tp=afoil.PressureSide_FCAD(npoints=npp,spacing=__spacing__,LE2TE=__LE2TEp__)
+    xsuc,ysuc,zsuc,ts=afoil.SuctionSide_FCAD(npoints=nps,spacing=__spacing__,LE2TE=__LE2TEs__)
+    timer.stop()
+
+    timer.start('interpolate')
+
+    if (Tvp or Tvs):
+        # Get tangent vector at leading/trailing edge
+        vecLE,vecTE=afoil.vecS()
+        vLEp,vLEs=nparr(vecLE[0:2]),nparr(vecLE[2:4])
+        vTEp,vTEs=nparr(vecTE[0:2]),nparr(vecTE[2:4])
+
+    if (Tvp):
+        if (__LE2TEp__) :
+            spP=__interpolate__(xpres,ypres,-vLEp,-vTEp)
+        else :
+            spP=__interpolate__(xpres,ypres,vTEp,vLEp)
+    else:
+        spP=__interpolate__(xpres,ypres)
+
+    if (Tvs):
+        if (__LE2TEs__) :
+            spS=__interpolate__(xsuc,ysuc,vLEs,vTEs)
+        else:
+            spS=__interpolate__(xsuc,ysuc,-vTEs,-vLEs)
+    else:
+        spS=__interpolate__(xsuc,ysuc)
+    timer.stop()
+
+    return spP,spS
+
+#
+# END : Functions for constructing the splines without FreeCAD
+###
@@ -0,0 +1,131 @@
+### PART OF FOIL LIBRARY
+#
+# Author: Konstantinos POLITIS
+#
+#   Inviscid pressure distribution, lift and moment of foils : Hess-Smith panel method
+#   (constant strength sources on every panel and one constant vortex strength on all
+#   the panels, Kutta condition of equal tangential velocities at the trailing edge)
+#
+#   The panels are the segments of the contour of afoil.points4Xfoil (pressure side from
+#   the trailing edge to the leading edge, then suction side to the trailing edge). The
+#   influence matrix is assembled at once (NumPy broadcasting) and factored once : the
+#   solutions for all the angles of attack are one back substitution (one right hand
+#   side per angle).
+#
+#   Many sections (e.g. all the radii of a blade) are solved together when they have the
+#   same number of points : (n_sections,N,2) contours.
+#
+#   Example :
+#        solver=PanelSolver(NACA("4412"),npoints=100)
+#        Cp,CL,CM=solver.solve([-4,0,4,8])       # Cp : (4,n_panels), CL, CM : (4,)
+#   All the radii of a blade :
+#        ys,yp,yc,yt=WAGENINGEN_sections(4,0.7,rR,x)
+#        Cp,CL,CM=PanelSolver(points=contours(x,ys,yp)).solve(alpha)
+#
+###
+
+def contour(afoil,npoints=100,spacing='cos'):
+    """ Points of the contour of afoil (see points4Xfoil) without the repeated leading edge point : (2*npoints-1,2) """
+    from numpy import delete
+    P=afoil.points4Xfoil(npoints,spacing)
+    # Spacing 'adaptive' : the number of points per side is not npoints
+    return delete(P,len(P)//2,axis=0)
+
+def contours(x,ys,yp):
+    """ Contours of sections given by their suction and pressure sides ys, yp (n_sections,n_x) at the same x (n_x,)
+        from the leading edge to the trailing edge (e.g. WAGENINGEN_sections) : (n_sections,2*n_x-1,2) """
+    from numpy import broadcast_to, concatenate, stack
+    X=broadcast_to(x,ys.shape)
+    return stack((concatenate((X[:,::-1],X[:,1:]),axis=1),concatenate((yp[:,::-1],ys[:,1:]),axis=1)),axis=-1)
+
+def __influence__(P):
+    """ Influence coefficients of the panels of the contours P (...,N+1,2) at their midpoints : returns the normal and tangential
+        velocities An, At (...,N,N) at the midpoint i of a unit source on panel j, the panel angles and the midpoints """
+    from numpy import arctan2, log, sin, cos, pi, hypot
+    X,Y=P[...,0],P[...,1]
+    dX,dY=X[...,1:]-X[...,:-1],Y[...,1:]-Y[...,:-1]
+    theta=arctan2(dY,dX)
+    xm,ym=0.5*(X[...,1:]+X[...,:-1]),0.5*(Y[...,1:]+Y[...,:-1])
+    # Distances of the midpoints i to the nodes j, angle subtended by the panel j at the midpoint i
+    rx,ry=X[...,None,:]-xm[...,:,None],Y[...,None,:]-ym[...,:,None]
+    r=hypot(rx,ry)
+    beta=arctan2(rx[...,:-1]*ry[...,1:]-ry[...,:-1]*rx[...,1:],rx[...,:-1]*rx[...,1:]+ry[...,:-1]*ry[...,1:])
+    N=theta.shape[-1]
+    i=range(N)
+    beta[...,i,i]=pi
+    L=log(r[...,1:]/r[...,:-1])
+    L[...,i,i]=0
+    dtheta=theta[...,:,None]-theta[...,None,:]
+    s,c=sin(dtheta),cos(dtheta)
+    An=(s*L+c*beta)/(2*pi)
+    At=(s*beta-c*L)/(2*pi)
+    return An, At, theta, xm, ym
+
+
+class PanelSolver:
+    """ Hess-Smith panel method for one foil or for many contours with the same number of points """
+
+    def __init__(self,afoil=None,npoints=100,spacing='cos',points=None):
+        """ Initialiser : the foil afoil (its contour from points4Xfoil with npoints per side and spacing) or the points of
+            closed contours (N+1,2) or (n_sections,N+1,2), from the trailing edge to the trailing edge. The contours are ordered as 
+            points4Xfoil (clockwise) : the counterclockwise contours are reversed. The influence matrix is assembled and factored here """
+        from numpy import asarray, zeros, concatenate, where
+        from scipy.linalg import lu_factor
+        if (points is None):
+            points=contour(afoil,npoints,spacing)
+        P=asarray(points,dtype=float)
+        self.single=(P.ndim==2)
+        P=P[None] if (self.single) else P
+        # Orientation : signed area of the polygons (positive for counterclockwise)
+        X,Y=P[...,0],P[...,1]
+        area=0.5*(X[:,:-1]*Y[:,1:]-X[:,1:]*Y[:,:-1]).sum(axis=-1)+0.5*(X[:,-1]*Y[:,0]-X[:,0]*Y[:,-1])
+        self.P=where((area>0)[:,None,None],P[:,::-1],P)
+        An,At,self.theta,self.xm,self.ym=__influence__(self.P)
+        self.ds=((self.P[:,1:]-self.P[:,:-1])**2).sum(axis=-1)**0.5
+        n,N=self.theta.shape
+        # Unknowns : the N source strengths and the vortex strength
+        # Rows 0..N-1 : no normal velocity at the midpoints, row N : Kutta condition (Vt on the first panel = -Vt on the last panel)
+        A=zeros((n,N+1,N+1))
+        A[:,:N,:N]=An
+        A[:,:N,N]=-At.sum(axis=-1)
+        A[:,N,:N]=At[:,0]+At[:,-1]
+        A[:,N,N]=An[:,0].sum(axis=-1)+An[:,-1].sum(axis=-1)
+        # Tangential velocities of the unknowns (for the pressure)
+        self.__T=concatenate((At,An.sum(axis=-1)[...,None]),axis=-1)
+        self.__lu=[lu_factor(a) for a in A]
+
+    def solve(self,alpha):
+        """ Solution for the angles of attack alpha (degrees, scalar or array of n_alpha) : returns
+              Cp : (n_alpha,N) pressure coefficients at the midpoints of the panels (xm, ym)
+              CL : (n_alpha,) lift coefficients, CM : (n_alpha,) moment coefficients about (0.25,0) (positive nose up)
+            with an extra first dimension n_sections for many contours (and without n_alpha for a scalar alpha) """
+        from numpy import asarray, atleast_1d, cos, sin, pi, concatenate, stack, einsum
+        from scipy.linalg import lu_solve
+        a=atleast_1d(asarray(alpha,dtype=float))*pi/180
+        # Right hand sides : one column per angle
+        d=a[None,None,:]-self.theta[:,:,None]
+        rhs=concatenate((-sin(d),-cos(d[:,:1])-cos(d[:,-1:])),axis=1)
+        q=stack([lu_solve(lu,b) for lu,b in zip(self.__lu,rhs)])
+        Vt=einsum('sij,sja->sai',self.__T,q)+cos(d).transpose(0,2,1)
+        Cp=1-Vt**2
+        # Forces (-Cp n ds, n=(-sin theta, cos theta) outward) and moment about the quarter chord
+        nx,ny=-sin(self.theta)[:,None],cos(self.theta)[:,None]
+        ds=self.ds[:,None]
+        Cx=-(Cp*nx*ds).sum(axis=-1)
+        Cy=-(Cp*ny*ds).sum(axis=-1)
+        CL=Cy*cos(a)-Cx*sin(a)
+        CM=(Cp*((self.xm[:,None]-0.25)*ny-self.ym[:,None]*nx)*ds).sum(axis=-1)
+        if (asarray(alpha).ndim==0):
+            Cp,CL,CM=Cp[:,0],CL[:,0],CM[:,0]
+        if (self.single):
+            return Cp[0], CL[0], CM[0]
+        return Cp, CL, CM
+
+
+def polars(foils,alpha,npoints=100,spacing='cos'):
+    """ CL and CM of many foils (e.g. the sections of a blade at all the radii) at the angles alpha (degrees) :
+        returns (n_foils,n_alpha) arrays (the foils are solved together) """
+    from numpy import stack
+    P=stack([contour(afoil,npoints,spacing) for afoil in foils])
+    Cp,CL,CM=PanelSolver(points=P).solve(alpha)
+    return CL, CM
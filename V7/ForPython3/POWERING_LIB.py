@@ -0,0 +1,188 @@
+### PART OF FOIL LIBRARY
+#
+# Author: Konstantinos POLITIS
+#
+#   Operating points of Wageningen B-series propellers (see KTKQ_LIB) :
+#   thrust/resistance balance
+#
+#        n_props KT rho n^2 D^4 = R(V)/(1-t) + F
+#        J = V (1-w)/(n D)
+#
+#   The balance is a cubic of J : KT(J) - c J^2 = 0 with c = T/(rho VA^2 D^2),
+#   T the thrust per propeller and VA = V (1-w) the advance speed. It is solved
+#   for all the points of a grid of V, P/D, EAR, Z, D at once (see operating_points).
+#
+#   The resistance curves R(V) are given as tables (see props_geo/resistance.txt).
+#
+###
+from KTKQ_LIB import default as openwater, Jpolynomials
+
+### Gravity acceleration (conversion of kp to N)
+__g__=9.807
+
+class Resistance:
+    """ Resistance curve R(V) : linear interpolation of a table (V,R) """
+
+    def __init__(self,V,R):
+        """ V : speeds (increasing), R : resistance at V """
+        from numpy import asarray
+        self.V=asarray(V,dtype=float)
+        self.R=asarray(R,dtype=float)
+
+    @classmethod
+    def from_file(cls,filename,factor=__g__):
+        """ Resistance curve of a table file (format of props_geo/resistance.txt : header then V R), R is multiplied by factor (kp to N) """
+        from numpy import loadtxt
+        VR=loadtxt(filename,skiprows=1,ndmin=2)
+        return cls(VR[:,0],VR[:,1]*factor)
+
+    def __call__(self,V):
+        """ Resistance at V (nan outside of the table) """
+        from numpy import interp, nan
+        return interp(V,self.V,self.R,left=nan,right=nan)
+
+
+class OperatingPoints:
+    """ Operating points (arrays of the broadcasted shape of the inputs of operating_points)
+            J    : advance ratio              n    : revolutions per second     RPM  : revolutions per minute
+            KT   : thrust coefficient         KQ   : torque coefficient         eta0 : open water efficiency
+            T    : thrust per propeller       Q    : torque per propeller       P    : delivered power (all propellers)
+            etaD : R V / P (propulsive efficiency with relative rotative efficiency 1)
+            Re   : Reynolds number at 0.75R (None if not used) """
+
+    def __init__(self,**values):
+        self.__dict__.update(values)
+
+
+def operating_points(V,P_D,EAR,Z,D,R,w=0,t=0,F=0,n_props=1,rho=1025,nu=None,nRe=3,tol=1e-12):
+    """ Solves the thrust/resistance balance for all the points of the grid V, P/D, EAR, Z, D (arrays broadcasted against each other)
+        Inputs :
+            R       : resistance curve (function of V, e.g. Resistance) or resistance values (array broadcasting with V)
+            w, t    : wake fraction and thrust deduction factor
+            F       : additional force (towing etc)
+            n_props : number of propellers
+            rho     : density
+            nu      : kinematic viscosity : if given, KT and KQ are corrected for the Reynolds number at 0.75R,
+                      which depends on n : the balance is solved nRe times with the Reynolds number of the last solution
+        Returns an OperatingPoints (J, n, RPM, KT, KQ, eta0, T, Q, P, etaD, Re) : nan where there is no solution
+        (V outside of the resistance curve or no positive thrust) """
+    from numpy import asarray, pi, where, nan, isfinite, broadcast_arrays
+    from KTKQ_LIB import Reynolds
+    ow=openwater()
+    ns=ow.ns
+    V,P_D,EAR,Z,D=[asarray(x,dtype=float) for x in (V,P_D,EAR,Z,D)]
+    Rt=R(V) if callable(R) else asarray(R,dtype=float)
+    VA=V*(1-w)
+    T=(Rt/(1-t)+F)/n_props
+    c=T/(rho*VA**2*D**2)
+    nd=max(x.ndim for x in (V,P_D,EAR,Z,D,c))
+    # The root is between J=0 (KT>0) and the zero thrust J (-c J^2<0)
+    J0=ow.JKT0(P_D,EAR,Z)
+    ok=isfinite(J0)&isfinite(c)&(c>0)
+    Re=None
+    for it in range(nRe if (nu is not None) else 1):
+        # Polynomials of J : KT-c J^2
+        A=ow.Jcoefs(P_D,EAR,Z,Re)
+        A=A.reshape((A.shape[0],)+(1,)*(nd+1-A.ndim)+A.shape[1:])
+        AT=broadcast_arrays(A[:ns],c)[0].copy()
+        AT[2]-=c
+        # The Reynolds number corrections move the zero thrust J : move the bracket if required
+        hi=where(ok,J0,1.)
+        for k in range(20):
+            pos=ok&(Jpolynomials.horner(AT,hi)>0)
+            if (not pos.any()):
+                break
+            hi=where(pos,hi+0.05,hi)
+        J=Jpolynomials.root(AT,0,hi,tol=tol)
+        J=where(ok,J,nan)
+        n=VA/(J*D)
+        if (nu is not None):
+            Re=Reynolds(VA,where(ok,n,0),D,EAR,Z,nu)
+    KT=Jpolynomials.horner(A[:ns],J)
+    KQ=Jpolynomials.horner(A[ns:],J)
+    Q=KQ*rho*n**2*D**5
+    P=n_props*2*pi*n*Q
+    return OperatingPoints(J=J,n=n,RPM=60*n,KT=KT,KQ=KQ,eta0=KT*J/(2*pi*KQ),T=KT*rho*n**2*D**4,Q=Q,P=P,etaD=Rt*V/P,Re=Re)
+
+
+### Selection of the B-series propeller of maximum efficiency 
+# Range of validity of the B-series polynomials 
+__P_D_range__=(0.5,1.4)
+__EAR_range__=(0.3,1.05)
+
+def keller_EAR(T,D,Z,h,k=0.2,p0=101325.,pv=1700.,rho=1025.):
+    """ Minimum expanded area ratio of the Keller cavitation criterion : EAR = (1.3+0.3 Z) T/((p0+rho g h-pv) D^2) + k 
+            T : thrust per propeller, h : immersion of the shaft axis, k : 0.2 for single screw ships, 0 to 0.1 for twin screw ships 
+        Note : use functools.partial to give h, k etc. to select_propeller (e.g. EAR_min=partial(keller_EAR,h=2)) """
+    return (1.3+0.3*Z)*T/((p0+rho*__g__*h-pv)*D**2)+k
+
+def __power__(V,P_D,EAR,Z,D,R,EAR_min,RPM,opts):
+    """ Operating points of the grid and delivered power where the constraints are satisfied (inf elsewhere) """
+    from numpy import isfinite, where, inf, asarray
+    op=operating_points(V,P_D,EAR,Z,D,R,**opts)
+    ok=isfinite(op.P)&(op.RPM>=RPM[0])&(op.RPM<=RPM[1])
+    if (EAR_min is not None):
+        ok&=(asarray(EAR)>=(EAR_min(op.T,asarray(D),asarray(Z)) if callable(EAR_min) else EAR_min))
+    return op, where(ok,op.P,inf)
+
+def __refine__(V,R,Z,x,dx,bounds,EAR_min,RPM,opts,m,levels):
+    """ Local refinement around x=(P/D,EAR,D) : grids of m points in [x-dx,x+dx], the window is shrunk around the best point at each level """
+    from numpy import linspace, clip, argmin, unravel_index, isfinite, array
+    x=array(x,dtype=float)
+    dx=array(dx,dtype=float)
+    for level in range(levels):
+        g=[clip(linspace(x[k]-dx[k],x[k]+dx[k],m),*bounds[k]) for k in range(3)]
+        op,P=__power__(V,g[0][:,None,None],g[1][:,None],Z,g[2],R,EAR_min,RPM,opts)
+        i=unravel_index(argmin(P),P.shape)
+        if (isfinite(P[i])):
+            x=array([g[0][i[0]],g[1][i[1]],g[2][i[2]]])
+        dx*=2./(m-1)
+    op,P=__power__(V,x[0],x[1],Z,x[2],R,EAR_min,RPM,opts)
+    op.__dict__.update(V=V,Z=int(Z),P_D=float(x[0]),EAR=float(x[1]),D=float(x[2]))
+    return op
+
+def select_propeller(V,R,Z=(3,4,5),D=(1.,3.),RPM=(0.,float('inf')),EAR_min=None,P_D=__P_D_range__,EAR=__EAR_range__,w=0,t=0,F=0,n_props=1,rho=1025,nu=None,
+                     ngrid=(10,8,8),ncand=4,nrefine=9,levels=6,processes=1):
+    """ Selection of the B-series propeller of minimum delivered power (maximum efficiency) at the speed V
+        Inputs : 
+            R        : resistance curve (see operating_points)
+            Z        : numbers of blades considered
+            D        : range of diameters (Dmin,Dmax), (D,D) for a given diameter
+            RPM      : range of admissible RPM
+            EAR_min  : minimum EAR : number or function of the thrust per propeller, D and Z (e.g. keller_EAR)
+            P_D, EAR : ranges of P/D, EAR (by default the range of validity of the B-series)
+            w,t,F,n_props,rho,nu : see operating_points
+            ngrid    : number of points of the coarse grid of P/D, EAR, D (for all the Z at once)
+            ncand    : number of best points of the coarse grid refined locally
+            nrefine  : number of points per direction of the refinement grids
+            levels   : number of refinement levels (the window is divided by (nrefine-1)/2 at each level)
+            processes: number of processes refining the candidates (1 : serial, None : all the cpus)
+        Returns the list of the distinct refined candidates (OperatingPoints with the attributes V, Z, P_D, EAR, D), best first 
+        (the candidates of the same Z closer than one step of the coarse grid are the same optimum) 
+        (empty if no point of the coarse grid satisfies the constraints) """
+    from numpy import linspace, asarray, argsort, isfinite, unravel_index, inf
+    opts=dict(w=w,t=t,F=F,n_props=n_props,rho=rho,nu=nu)
+    bounds=[P_D,EAR,D]
+    g=[linspace(b[0],b[1],n) for b,n in zip(bounds,ngrid)]
+    Zs=asarray(Z).reshape(-1)
+    # Coarse screening : all the Z at once
+    op,P=__power__(V,g[0][:,None,None,None],g[1][:,None,None],Zs[:,None],g[2],R,EAR_min,RPM,opts)
+    best=[i for i in argsort(P,axis=None)[:ncand] if isfinite(P.flat[i])]
+    dx=[(b[1]-b[0])/max(n-1,1) for b,n in zip(bounds,ngrid)]
+    jobs=[]
+    for i in best:
+        iP,iE,iZ,iD=unravel_index(i,P.shape)
+        jobs.append((V,R,Zs[iZ],(g[0][iP],g[1][iE],g[2][iD]),dx,bounds,EAR_min,RPM,opts,nrefine,levels))
+    if (processes==1):
+        cand=[__refine__(*job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(processes) as pool:
+            cand=list(pool.map(__refine__,*zip(*jobs))) if jobs else []
+    # Candidates refined to the same optimum are kept once (the best one) : same Z and closer than one step of the coarse grid
+    # for P/D, EAR and D (the refinements of neighbouring points of the coarse grid stop at different points of a flat optimum)
+    selected=[]
+    for op in sorted(cand,key=lambda op: op.P if isfinite(op.P) else inf):
+        if all((op.Z!=s.Z) or (abs(op.P_D-s.P_D)>dx[0]) or (abs(op.EAR-s.EAR)>dx[1]) or (abs(op.D-s.D)>dx[2]) for s in selected):
+            selected.append(op)
+    return selected
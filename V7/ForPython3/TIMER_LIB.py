@@ -0,0 +1,124 @@
+### PART OF FOIL LIBRARY
+#
+# Author: Konstantinos POLITIS
+#
+#   Timing of the stages of the construction of the sections (see Doc.profile
+#   of FCFoil and NPFoil) : cumulative time and number of calls per stage and,
+#   optionally, the time of the stages for every section.
+#
+#   The stages are timed by :
+#        with timer.stage("name"):
+#            ...
+#   or by timer.start("name") ... timer.stop() (the stages may be nested).
+#   When the timing is disabled, notimer is used : its stages do nothing.
+#
+###
+from time import perf_counter
+
+
+class StageTimer:
+    """ Cumulative time and number of calls of the stages (and records per section if sections=True) """
+
+    def __init__(self,sections=False):
+        self.keep_sections=sections
+        self.reset()
+
+    def reset(self):
+        """ Clears the timings """
+        self.stages={}
+        self.sections=[]
+        self.current=None
+        self.__names=[]
+        self.__t0=[]
+
+    def stage(self,name):
+        """ Context manager timing the stage name """
+        self.__names.append(name)
+        return self
+
+    def start(self,name):
+        """ Starts the stage name """
+        self.__names.append(name)
+        self.__t0.append(perf_counter())
+
+    def stop(self):
+        """ Stops the last started stage """
+        self.__exit__()
+
+    def __enter__(self):
+        self.__t0.append(perf_counter())
+        return self
+
+    def __exit__(self,*exc):
+        dt=perf_counter()-self.__t0.pop()
+        name=self.__names.pop()
+        s=self.stages.get(name)
+        if (s is None):
+            self.stages[name]=[dt,1]
+        else:
+            s[0]+=dt
+            s[1]+=1
+        if (self.current is not None):
+            self.current[name]=self.current.get(name,0.)+dt
+        return False
+
+    def begin_section(self,zL):
+        """ Starts the record of the section at zL (if the records per section are kept) """
+        if (self.keep_sections):
+            self.current={'zL':float(zL)}
+
+    def end_section(self,name):
+        """ Ends the record of the current section """
+        if (self.current is not None):
+            self.current['name']=name
+            self.sections.append(self.current)
+            self.current=None
+
+    def report(self):
+        """ Returns the timings as a dict : {'stages' : {name : {'time' : seconds, 'calls' : number}}, 'sections' : [{'zL', 'name', stage : seconds}]} """
+        R={'stages':{name:{'time':t,'calls':n} for name,(t,n) in self.stages.items()}}
+        if (self.keep_sections):
+            R['sections']=list(self.sections)
+        return R
+
+    def to_json(self,filename=None):
+        """ Returns the report as a JSON string, written to filename if given """
+        import json
+        txt=json.dumps(self.report(),indent=1)
+        if (filename is not None):
+            with open(filename,'w') as f:
+                f.write(txt)
+        return txt
+
+    def show(self):
+        """ Prints the cumulative times of the stages (percentages of the stage add if timed) """
+        total=self.stages['add'][0] if ('add' in self.stages) else sum(t for t,n in self.stages.values())
+        for name,(t,n) in sorted(self.stages.items(),key=lambda s: -s[1][0]):
+            print("{:20s} {:10.4f} s {:6.1f} % {:8d} calls".format(name,t,100*t/max(total,1e-300),n))
+
+
+class __NoTimer__:
+    """ Disabled timer : the stages do nothing """
+
+    def stage(self,name):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc):
+        return False
+
+    def start(self,name):
+        pass
+
+    def stop(self):
+        pass
+
+    def begin_section(self,zL):
+        pass
+
+    def end_section(self,name):
+        pass
+
+notimer=__NoTimer__()
@@ -6,7 +6,7 @@
 #   
 #  To do list : 
 #         1. Seperate propeller parts from foil parts 
-#         2. Rework interpolation (for now linear) for V1, V2 values 
+#         2. Rework interpolation (for now linear or cubic) for V1, V2 values 
 #         3. Add "smoothing" option (or extend option) for squared trailing edges
 #         4. Remove Use_Original Option : Create variants for Bseries propellers 
 #            using modified distributions of K(z)
@@ -28,8 +28,112 @@
 ###
 from FOIL  import afoil as foil
 from numpy import array as nparr
+from collections import OrderedDict
 
-def WAGENINGEN(Z,EAR,rR,tLE_tmax=0.,tTE_tmax=0,Use_Original=1,Use_Smooth=0,s=0,Smooth_LE=0,x0s=0.1,x0p=0.1,ks=0.5,kp=0.5):
+### Cache of the propeller splines
+# The splines c/R, xtmax, tmax/R and the V1, V2 interpolations (or bivariate smoothing 
+# splines) depend only on the propeller and not on the radius r/R of the section. They 
+# are stored here (the least recently used are dropped first) and are shared by all the 
+# sections of the same propeller, so that constructing a section only fits its own splines. 
+__splines_cache_size__=32
+__splines_cache__=OrderedDict()
+
+def clear_splines_cache():
+    """ Remove all the propeller splines stored in the cache """
+    __splines_cache__.clear()
+
+def set_splines_cache_size(n):
+    """ Set the maximum number of propellers whose splines are kept in the cache (0 disables the cache) """
+    global __splines_cache_size__
+    __splines_cache_size__=max(int(n),0)
+    while (len(__splines_cache__)>__splines_cache_size__):
+        __splines_cache__.popitem(last=False)
+
+### Batched interpolating splines 
+# Used to evaluate at once the sections of many radii : every row of the arrays 
+# is a different set of data. The splines are the same as the ones constructed 
+# by UnivariateSpline(x,y,k,s=0), i.e. interpolating with knots at the interior data.
+def __bspline_basis__(t,x,k):
+    """ Values of the B-spline basis functions of degree k for knots t (n,nt) at x (n,m) : returns (n,m,nt-k-1) """
+    from numpy import logical_and, errstate, where
+    t=t[:,None,:]
+    x=x[:,:,None]
+    # degree 0 : the last non empty interval is closed at its right end
+    B=logical_and(t[...,:-1]<=x,x<t[...,1:])*1.
+    B[...,-k-1]+=(x[...,0]==t[...,-1])
+    with errstate(divide='ignore',invalid='ignore'):
+        for p in range(1,k+1):
+            dl=t[...,p:-1]-t[...,:-p-1]
+            dr=t[...,p+1:]-t[...,1:-p]
+            wl=where(dl>0,(x-t[...,:-p-1])/dl,0.)
+            wr=where(dr>0,(t[...,p+1:]-x)/dr,0.)
+            B=wl*B[...,:-1]+wr*B[...,1:]
+    return B
+
+def __interp_splines__(x,Y,xq,k=5):
+    """ Interpolating splines through the rows of x (n,m) with data Y (n,m,q) evaluated at xq (n,mq) : returns (n,mq,q) """
+    from numpy import concatenate, repeat, clip, take_along_axis, arange
+    from numpy.linalg import solve
+    n,m=x.shape
+    t=concatenate((repeat(x[:,:1],k+1,axis=1),x[:,(k+1)//2:m-(k+1)//2],repeat(x[:,-1:],k+1,axis=1)),axis=1)
+    C=solve(__bspline_basis__(t,x,k),Y)
+    # Evaluation by de Boor's algorithm : only the k+1 non zero basis functions at each xq are used
+    xq=clip(xq,x[:,:1],x[:,-1:])
+    j=clip((t[:,None,:]<=xq[:,:,None]).sum(axis=-1)-1,k,m-1)
+    i=j[...,None]+arange(-k,1)
+    d=take_along_axis(C[:,None,:,:],i[...,None],axis=2)
+    ti=take_along_axis(t[:,None,:],j[...,None]+arange(-k+1,k+1),axis=2)
+    for r in range(1,k+1):
+        tl=ti[...,r-1:k]
+        tr=ti[...,k:2*k-r+1]
+        alpha=((xq[...,None]-tl)/(tr-tl))[...,None]
+        d=(1-alpha)*d[...,:-1,:]+alpha*d[...,1:,:]
+    return d[...,0,:]
+
+### Interpolation of the V1, V2 tables 
+class Vtable:
+    """ Interpolation of a table V given on the regular grid (rR,a) : V(a,rR) 
+        Outside of the grid the values at the closest rR, a are used """
+    
+    def __init__(self,rR,a,V,kind='linear'):
+        """ Initialiser : grid rR, a, table V (len(rR),len(a)) and kind of interpolation ('linear' or 'cubic') """
+        from scipy.interpolate import RectBivariateSpline
+        self.rR=rR
+        self.a=a
+        self.kind=kind
+        k={'linear':1,'cubic':3}[kind]
+        self.interp=RectBivariateSpline(rR,a,V,kx=k,ky=k,s=0)
+    
+    def __call__(self,a,rR):
+        """ Values at a, rR (arrays are broadcasted against each other) """
+        from numpy import clip, broadcast_arrays
+        a,rR=broadcast_arrays(clip(a,self.a[0],self.a[-1]),clip(rR,self.rR[0],self.rR[-1]))
+        return self.interp.ev(rR.ravel(),a.ravel()).reshape(a.shape)
+
+### Bivariate smoothing splines (Use_Smooth)
+class Bsurface:
+    """ Bivariate B-spline surface given by its knots, coefficients and degrees (tck of a scipy BivariateSpline) : 
+        evaluated as the BivariateSpline on the grid x, y, but small to pickle or store (see BseriesFoil.smooth_surfaces) """
+    
+    def __init__(self,tx,ty,c,kx,ky):
+        from numpy import asarray
+        self.tck=(asarray(tx,dtype=float),asarray(ty,dtype=float),asarray(c,dtype=float),int(kx),int(ky))
+    
+    @classmethod
+    def from_spline(cls,sp):
+        """ Surface of a scipy BivariateSpline """
+        tx,ty=sp.get_knots()
+        return cls(tx,ty,sp.get_coeffs(),*sp.degrees)
+    
+    def __call__(self,x,y):
+        """ Values on the grid x, y (increasing) : returns (len(x),len(y)) """
+        from numpy import atleast_1d, ravel
+        from scipy.interpolate import bisplev
+        x=ravel(x)
+        y=atleast_1d(y)
+        return atleast_1d(bisplev(x,y,self.tck)).reshape(len(x),len(y))
+
+def WAGENINGEN(Z,EAR,rR,tLE_tmax=0.,tTE_tmax=0,Use_Original=1,Use_Smooth=0,s=0,Smooth_LE=0,x0s=0.1,x0p=0.1,ks=0.5,kp=0.5,Vkind='linear'):
     """ WAGENINGEN Picker 
     Inputs :
       Z                  : number of blades 
@@ -54,8 +158,38 @@ def WAGENINGEN(Z,EAR,rR,tLE_tmax=0.,tTE_tmax=0,Use_Original=1,Use_Smooth=0,s=0,S
       ks, kp             : shape parameter 0<k<1 of the Weibull distribution used for smoothing. For k near zero the smoothing is 
                            close to a smoothed heaviside step function. k=1 closer to a ramp function (actually an exponential).
                            Note: the smoothing affects the suction/pressure side of whole foil.  
+      Vkind              : interpolation of the V1, V2 tables when Use_Smooth is false 
+                            default = 'linear'
+                                    = 'cubic'
+      """
+    return BseriesFoil(Z,EAR,rR,tLE_tmax,tTE_tmax,Use_Original,Use_Smooth,s,Smooth_LE,x0s,x0p,ks,kp,Vkind) 
+
+def WAGENINGEN_blade(Z,EAR,P_D,rR,x,skew=0,rake=None,R=1,tLE_tmax=0.,tTE_tmax=0,Use_Original=1,Smooth_LE=0,x0s=0.1,x0p=0.1,ks=0.5,kp=0.5,Vkind='linear',Use_Smooth=0,s=0):
+    """ Blade of a WAGENINGEN propeller : sections at many radii wrapped on their pitch helices 
+    Inputs :
+      Z, EAR, ...        : see WAGENINGEN_sections
+      P_D                : pitch over diameter (scalar or one value per radius)
+      skew               : skew angle (degrees) of the generator line, positive towards the trailing edge (scalar or one value per radius)
+      rake               : rake over radius of the generator line (default : the 15 degrees rake of the B-series)
+      R                  : radius of the propeller 
+    Returns :
+      back, face         : (n_r,n_x,3) arrays of the points of the suction and pressure side (see BLADE_LIB for the coordinates)
+      """
+    from numpy import ravel
+    return BseriesFoil(Z,EAR,ravel(rR)[0],tLE_tmax,tTE_tmax,Use_Original,Use_Smooth,s,Smooth_LE,x0s,x0p,ks,kp,Vkind).blade(rR,x,P_D,skew,rake,R)
+
+def WAGENINGEN_sections(Z,EAR,rR,x,tLE_tmax=0.,tTE_tmax=0,Use_Original=1,Smooth_LE=0,x0s=0.1,x0p=0.1,ks=0.5,kp=0.5,Vkind='linear',Use_Smooth=0,s=0):
+    """ Sections of a WAGENINGEN propeller at many radii
+    Inputs :
+      Z, EAR, ...        : see WAGENINGEN (Smooth_LE is not available with Use_Smooth)
+      rR                 : array of n_r non dimensional radii (r/R)
+      x                  : array of n_x locations x=X/c (or an (n_r,n_x) array, one row per radius)
+    Returns :
+      Ys, Yp, yc, yt     : (n_r,n_x) arrays of suction side, pressure side, camber line and half thickness
+                           The values are the same as the ones of the WAGENINGEN foils at each radius
       """
-    return BseriesFoil(Z,EAR,rR,tLE_tmax,tTE_tmax,Use_Original,Use_Smooth,s,Smooth_LE,x0s,x0p,ks,kp) 
+    from numpy import ravel
+    return BseriesFoil(Z,EAR,ravel(rR)[0],tLE_tmax,tTE_tmax,Use_Original,Use_Smooth,s,Smooth_LE,x0s,x0p,ks,kp,Vkind).sections(rR,x)
     
 class BseriesFoil(foil):
     
@@ -63,6 +197,17 @@ class BseriesFoil(foil):
     # The code sets the following variable to True when the splines for a given propeller are constructed
     __splines_constructed=False
     
+    # Lazy construction : the splines are constructed when they are first used (see __getattr__)
+    # Attributes of the groups of splines and the functions that construct them
+    __lazy=dict([(a,'construct_radial_splines') for a in ('cR','xtmaxSp','tmaxR')]
+               +[(a,'construct_splines') for a in ('V1int','V2int','yscSp','ypcSp','_BseriesFoil__Xc','_BseriesFoil__r',
+                                                   '_BseriesFoil__ytc','_BseriesFoil__ypc','_BseriesFoil__ysc',
+                                                   '_BseriesFoil__yscu','_BseriesFoil__ypcu')]
+               +[(a,'construct_section_splines') for a in ('ypsp','yssp','ytsp','ycsp')])
+    
+    # Attributes that are not parameters of the foil (see CACHE_LIB.parameters) : the splines are constructed from the parameters
+    cache_ignore=foil.cache_ignore+('_BseriesFoil__splines_constructed',)+tuple(__lazy)
+    
     # Hub Radius 
     __rR_Hub=0.167
     
@@ -105,6 +250,15 @@ class BseriesFoil(foil):
     __Kr=nparr([1.633, 1.832, 2.0, 2.12, 2.186, 2.199, 2.127, 1.657, 0]) 
     #######################  END OF K(r)
         
+    ####################### a(r) : Location of the generator line (distance from the leading edge over the chord)
+    # Data from Oosterveld 1975 (see props_geo/Wageningen3.txt, props_geo/Wageningen4+.txt) at r/R=0.2, ..., 0.9
+    __ac_3=nparr([0.616, 0.611, 0.599, 0.583, 0.558, 0.526, 0.481, 0.400])
+    __ac_4=nparr([0.617, 0.613, 0.601, 0.586, 0.561, 0.524, 0.463, 0.351])
+    
+    # Rake angle of the generator line (degrees)
+    __rake_angle=15
+    ####################### END OF a(r)
+    
     ####################### xtmax(r) : Function used for the Location of maximum thickness
     # x_tmax=X_tmax/c (4 blades +) > Data from Kuiper 1992
     __xtmax_Kuiper=nparr([0.35, 0.35, 0.351, 0.355, 0.389, 0.443, 0.486, 0.5, 0.5])
@@ -202,7 +356,7 @@ class BseriesFoil(foil):
     
     
     # Initialiser
-    def __init__(self,Z,EAR,rR,tLE_tmax=0.2,tTE_tmax=0,Use_Original=1,Use_Smooth=0,s=0,Smooth_LE=0,x0s=0.1,x0p=0.1,ks=0.8,kp=0.8):
+    def __init__(self,Z,EAR,rR,tLE_tmax=0.2,tTE_tmax=0,Use_Original=1,Use_Smooth=0,s=0,Smooth_LE=0,x0s=0.1,x0p=0.1,ks=0.8,kp=0.8,Vkind='linear'):
         """ Initialiser : Parameters, and closed LEADING edge specifier """
         # NOTE : Here TE_Closed refers to the LEADING EDGE
         # Wageningen Foil Group
@@ -227,31 +381,80 @@ class BseriesFoil(foil):
         
         # Spline Construction Group
         # note if Use_Smooth is false then s has no effect
+        # note the splines are constructed when they are first used (see __getattr__)
         self.Use_Smooth=Use_Smooth
         self.s=s
-        self.construct_splines()
-        if (self.Use_Smooth):
-            self.construct_pres_suct_rR_representation() 
-        else:
-            self.construct_pres_suct_rR_representation2() 
+        self.Vkind=Vkind
+        if (not self.Use_Smooth):
             # setup smoothing parameters
             self.smooth_at_LE_WeibParams(x0s,ks,x0p,kp)
     
+    def __getattr__(self,name):
+        """ Constructs the group of splines of the attribute name when it is first used """
+        group=BseriesFoil.__lazy.get(name)
+        if (group is None or name in self.__dict__):
+            raise AttributeError(name)
+        getattr(self,group)()
+        if (name not in self.__dict__):
+            # e.g. ytsp with Use_Smooth
+            raise AttributeError(name)
+        return self.__dict__[name]
+    
+    # Key of the propeller splines inside the splines cache
+    def splines_key(self):
+        """ Parameters defining the splines that do not depend on r/R """
+        return (self.Z,self.EAR,self.Use_Original,self.Use_Smooth,self.tLE_tmax,self.tTE_tmax,self.s,self.Vkind)
+    
+    def __cached(self,key,construct):
+        """ Constructs a group of splines by construct() or gets them from the splines cache """
+        if (key in __splines_cache__):
+            # The splines of this propeller are already constructed : share them
+            __splines_cache__.move_to_end(key)
+            self.__dict__.update(__splines_cache__[key])
+            return
+        constructed_before=set(self.__dict__)
+        construct()
+        if (__splines_cache_size__>0):
+            # Store everything constructed above 
+            __splines_cache__[key]={k:v for k,v in self.__dict__.items() if k not in constructed_before}
+            while (len(__splines_cache__)>__splines_cache_size__):
+                __splines_cache__.popitem(last=False)
+    
+    # Construct the splines for c(r)/D, tmax/D, Xtmax/D 
+    def construct_radial_splines(self):
+        """ Constructs the splines c/R, xtmax, tmax/R (once) """
+        if ('cR' in self.__dict__):
+            return
+        def construct():
+            self.construct_cRspl()
+            self.construct_xtmaxspl()
+            self.construct_tmaxRspl()
+        self.__cached(('radial',self.Z,self.EAR,self.Use_Original),construct)
+    
     # Construct the required splines for c(r)/D, tmax/D, Xtmax/D ...
     def construct_splines(self):
-        from scipy import interpolate
-        from numpy import zeros_like, ones_like, meshgrid, delete
+        """ Constructs the splines of the propeller (once) : radial splines and V1, V2 tables """
         if (self.__splines_constructed):
-            pass
-        self.construct_cRspl()
-        self.construct_xtmaxspl()
-        self.construct_tmaxRspl()
-        # note : the subroutine below only prepares data for visualisation using the plot_V2 function
-        #        as long as Use_Smooth is false
-        self.construct_pres_suct_smoothing()
-        if (not self.Use_Smooth):
-            self.construct_pres_suct_smoothing2()
+            return
+        self.construct_radial_splines()
+        def construct():
+            # note : the subroutine below only prepares data for visualisation using the plot_V2 function
+            #        as long as Use_Smooth is false
+            self.construct_pres_suct_smoothing()
+            if (not self.Use_Smooth):
+                self.construct_pres_suct_smoothing2()
+        self.__cached(self.splines_key(),construct)
         self.__splines_constructed=True
+    
+    def construct_section_splines(self):
+        """ Constructs the splines of the section at r/R (once) """
+        if ('ypsp' in self.__dict__):
+            return
+        self.construct_splines()
+        if (self.Use_Smooth):
+            self.construct_pres_suct_rR_representation() 
+        else:
+            self.construct_pres_suct_rR_representation2() 
         
         
     def construct_cRspl(self):
@@ -283,7 +486,6 @@ class BseriesFoil(foil):
     #                                                                yp/c=yp/tmax * tmax/c
     # 
     def construct_pres_suct_smoothing(self):
-        from scipy import interpolate
         from numpy import zeros_like, ones_like, meshgrid, delete
         # Contruction of V2 spline
         #self.V2=interpolate.SmoothBivariateSpline(tile(self.__a.,len(self.__rR_V)),tile(self.__rR_V,len(self.__a)),self.__V2,s=0)
@@ -314,7 +516,6 @@ class BseriesFoil(foil):
             #print(self.__yscu[:,1])
             #print(self.__yscu.ravel())
             #self.yscSp=interpolate.SmoothBivariateSpline(delete(self.__Xc,[1],1).ravel(),delete(r,[1],1).ravel(),delete(self.__yscu,[1],1).ravel(),kx=5,ky=3,s=1e-2)
-            self.yscSp=interpolate.SmoothBivariateSpline(self.__Xc.ravel(),r.ravel(),self.__ysc.ravel(),kx=3,ky=3,s=self.s)
             #self.yscSp=interpolate.SmoothBivariateSpline(a.ravel(),r.ravel(),self.__yscu.ravel(),kx=5,ky=3,s=0)
             self.__ypcu=self.__ypc.copy()
             #self.__ypcu=delete(self.__ypc,[1,2],1)
@@ -322,7 +523,29 @@ class BseriesFoil(foil):
             #print(self.__ypcu[:,1])
             #print(self.__yscu.ravel())
             #self.ypcSp=interpolate.SmoothBivariateSpline(delete(self.__Xc,[1],1).ravel(),delete(r,[1],1).ravel(),delete(self.__ypcu,[1],1).ravel(),kx=5,ky=3,s=1e-2)
-            self.ypcSp=interpolate.SmoothBivariateSpline(self.__Xc.ravel(),r.ravel(),self.__ypc.ravel(),kx=3,ky=3,s=self.s)
+            # The surfaces are fitted once per propeller (and kept in the disk cache if enabled)
+            self.yscSp,self.ypcSp=self.smooth_surfaces()
+    
+    def smooth_surfaces(self):
+        """ Bivariate smoothing splines ys/c(x/c,r/R), yp/c(x/c,r/R) of the suction and pressure sides (Use_Smooth) as Bsurface 
+            If the disk cache is enabled (see FOIL.enable_disk_cache) their coefficients are stored there : the fit is shared by 
+            all the processes """
+        import FOIL
+        from scipy import interpolate
+        def fit():
+            E={}
+            for side,y in (('s',self.__ysc),('p',self.__ypc)):
+                sp=Bsurface.from_spline(interpolate.SmoothBivariateSpline(self.__Xc.ravel(),self.__r.ravel(),y.ravel(),kx=3,ky=3,s=self.s))
+                for name,v in zip(('tx','ty','c','kx','ky'),sp.tck):
+                    E[side+name]=v
+            return E
+        if (FOIL.disk_cache is None):
+            E=fit()
+        else:
+            from CACHE_LIB import key_of_class
+            # Same surfaces for all the radii
+            E=FOIL.disk_cache.get_or_compute(key_of_class(type(self),'smooth_surfaces',self.splines_key()),fit)
+        return tuple(Bsurface(*[E[side+name] for name in ('tx','ty','c','kx','ky')]) for side in ('s','p'))
     
         
     def construct_pres_suct_rR_representation(self):
@@ -346,10 +569,19 @@ class BseriesFoil(foil):
         self.yssp=interpolate.UnivariateSpline(x,ys,k=5,s=0)
     
     def construct_pres_suct_smoothing2(self):
-        from scipy import interpolate
-        # Specify how we interpolate the values of the tables V1 and V2 : here simple linear interpolations
-        self.V1int=interpolate.interp2d(self.__a,self.__rR_V,self.__V1, kind='linear')
-        self.V2int=interpolate.interp2d(self.__a,self.__rR_V,self.__V2, kind='linear')
+        # Specify how we interpolate the values of the tables V1 and V2 : linear (or cubic) interpolations 
+        # Note : the interpolations are constructed once and shared by all foils
+        self.V1int,self.V2int=self.Vinterpolations(self.Vkind)
+    
+    # Interpolations of the tables V1 and V2 for each kind of interpolation
+    __Vint={}
+    
+    @classmethod
+    def Vinterpolations(cls,kind='linear'):
+        """ Interpolations V1(a,rR), V2(a,rR) of the tables V1, V2 (kind = 'linear' or 'cubic') """
+        if (kind not in cls.__Vint):
+            cls.__Vint[kind]=(Vtable(cls.__rR_V,cls.__a,cls.__V1,kind),Vtable(cls.__rR_V,cls.__a,cls.__V2,kind))
+        return cls.__Vint[kind]
     
     def construct_pres_suct_rR_representation2(self):
         from numpy import where
@@ -378,9 +610,66 @@ class BseriesFoil(foil):
         # for the (half)thickness and the camber (mean) line
         self.ytsp=interpolate.UnivariateSpline(x,yt*0.5,k=5,s=0)
         self.ycsp=interpolate.UnivariateSpline(x,yc,k=5,s=0)
+    
+    def sections(self,rR,x):
+        """ Suction side, pressure side, camber line and half thickness of this propeller at the radii rR and locations x : returns (n_r,n_x) arrays """
+        from numpy import asarray, atleast_1d, broadcast_to, where, stack
+        rR=atleast_1d(asarray(rR,dtype=float)).ravel()
+        x=atleast_1d(asarray(x,dtype=float))
+        x=broadcast_to(x,(len(rR),x.shape[-1]))
+        if (self.Use_Smooth):
+            return self.__smooth_sections(rR,x)
+        # Values of V1 and V2 at all r/R (as construct_pres_suct_rR_representation2 does for one radius)
+        V1=self.V1int(self.__a[None,:],rR[:,None])
+        V2=self.V2int(self.__a[None,:],rR[:,None])
+        # Values of x/c that correspond to the a of the tables for every radius
+        xa=self.a2x(self.__a[None,:],rR[:,None])
+        # Pressure side and thickness as yp/c and yt/c 
+        yp=where(self.__a<0,V1*(1-self.tLE_tmax),V1*(1-self.tTE_tmax))
+        yt=where(self.__a<0,V2*(1-self.tLE_tmax)+self.tLE_tmax,V2*(1-self.tTE_tmax)+self.tTE_tmax)
+        tc=(self.tmaxR(rR)/self.cR(rR))[:,None]
+        # Splines through the data of every radius evaluated at x
+        Y=__interp_splines__(xa,stack((yp*tc,yt*tc*0.5),axis=-1),x)
+        yp=Y[...,0]
+        yt=Y[...,1]
+        yc=yp+yt
+        if (self.Smooth_LE):
+            return yc+yt*self.Weibuls(x), yc-yt*self.Weibulp(x), yc, yt
+        return yp+2*yt, yp, yc, yt
         
-        
-        
+    def __smooth_sections(self,rR,x):
+        """ sections for Use_Smooth : construct_pres_suct_rR_representation for all the radii rR at once """
+        from numpy import linspace, sqrt, where, stack, argsort, concatenate, repeat, empty
+        from scipy.interpolate import make_interp_spline, BSpline
+        if (self.Smooth_LE):
+            raise NotImplementedError("Smooth_LE is not available for Use_Smooth")
+        # The surfaces are evaluated on grids of increasing r/R
+        o=argsort(rR)
+        r=rR[o]
+        npoints=100
+        xs=linspace(0,1,npoints).reshape(-1,1)
+        yp=self.ypcSp(xs,r)
+        m=(self.yscSp(0,r)+self.ypcSp(0,r))*0.5
+        asuc=(m-self.yscSp(0.2,r))/sqrt(0.2)
+        yp[0]=m
+        ys=where(xs<=0.2,m-asuc*sqrt(xs),self.yscSp(xs,r))
+        ys[npoints-1]=yp[npoints-1]
+        # Interpolating splines of degree 5 of every radius (as the UnivariateSpline of one radius) : the data of all the 
+        # radii are at the same xs, so that the splines share their knots and are constructed at once
+        k=5
+        xs=xs[:,0]
+        t=concatenate((repeat(xs[:1],k+1),xs[(k+1)//2:npoints-(k+1)//2],repeat(xs[-1:],k+1)))
+        sp=make_interp_spline(xs,stack((ys,yp),axis=-1),k=k,t=t)
+        Y=empty(x.shape+(2,))
+        if ((x==x[:1]).all()):
+            Y[o]=sp(x[0]).transpose(1,0,2)
+        else:
+            for i,j in enumerate(o):
+                Y[j]=BSpline(t,sp.c[:,i],k)(x[j])
+        ys=Y[...,0]
+        yp=Y[...,1]
+        return ys, yp, (ys+yp)*0.5, (ys-yp)*0.5
+    
     def smooth_at_LE_WeibParams(self,x0_s,k_s,x0_p,k_p):
         from numpy import log
         # Create a smooth transition at LE
@@ -411,6 +700,35 @@ class BseriesFoil(foil):
         n="B"+"{:d}".format(self.Z)+"_"+"{:.0f}".format(self.EAR*100)+"_rR="+"{:.2f}".format(self.rR)
         return n    
     
+    # Location of the generator line 
+    def xgen(self,rR):
+        """ Location of the generator line for the requested radius (distance from the leading edge over the chord) 
+            Note : the data end at r/R=0.9 (the spline is extrapolated up to the tip) """
+        from scipy.interpolate import make_interp_spline
+        ac=self.__ac_3 if (self.Z<=3) else self.__ac_4
+        return make_interp_spline(self.__rR[:-1],ac,k=3)(rR)
+    
+    def rake(self,rR):
+        """ Rake over radius of the generator line for the requested radius (15 degrees rake, towards the trailing edge) """
+        from numpy import tan, pi
+        return rR*tan(self.__rake_angle*pi/180)
+    
+    def blade(self,rR,x,P_D,skew=0,rake=None,R=1):
+        """ Points of the back (suction side) and face (pressure side) of the blade wrapped on the pitch helices (see BLADE_LIB.wrap_sections)
+            rR : array of n_r radii, x : locations x=X/c, P_D : pitch over diameter, skew : skew angle (degrees), rake : rake over radius 
+            (default : the 15 degrees rake of the B-series), R : radius. Returns two (n_r,n_x,3) arrays """
+        from BLADE_LIB import wrap_sections
+        from numpy import asarray, atleast_1d, broadcast_to, concatenate
+        rR=atleast_1d(asarray(rR,dtype=float)).ravel()
+        Ys,Yp,yc,yt=self.sections(rR,x)
+        if (rake is None):
+            rake=self.rake(rR)
+        # Both sides are wrapped at once
+        X=broadcast_to(x,Ys.shape)
+        n=Ys.shape[1]
+        P=wrap_sections(rR,concatenate((X,X),axis=1),concatenate((Ys,Yp),axis=1),self.cR(rR),P_D,self.xgen(rR),skew,rake,R)
+        return P[:,:n], P[:,n:]
+    
     # Location of maximum thickness for the requested radius
     # Value of xtmax
     def xtmax(self,rR):